@@ -1,8 +1,41 @@
 import os
 import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 import numpy as np
-from typing import List, Dict, Any, Optional
+from botocore.config import Config
+from typing import List, Dict, Any, Optional, Callable
+
+# Pool sized for the concurrent embedding fan-out, with TCP keepalive so
+# repeat invoke_model calls reuse warm TLS connections
+BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+try:
+    import faiss  # Optional: exact SIMD inner-product index for large policy sets
+except ImportError:
+    faiss = None
+
+try:
+    import ijson  # Optional: incremental parsing of embedding response bodies
+except ImportError:
+    ijson = None
+
+try:
+    import simsimd  # Optional: AVX-512/NEON cosine kernels, used when FAISS is absent
+except ImportError:
+    simsimd = None
+
+try:
+    from orjson import loads as json_loads  # Optional: faster parsing of Bedrock responses
+except ImportError:
+    json_loads = json.loads
 
 class DisputeResolutionAgent:
     """
@@ -11,23 +44,41 @@ class DisputeResolutionAgent:
     - RAG-style retrieval over policies
     - Generative draft responses and suggested actions
     """
+
+    # Supported dispute classifications, in matching priority order
+    DISPUTE_LABELS = ('fraud', 'billing', 'service')
+
+    # Query/policy embeddings shared by all agents in the process, keyed by
+    # SHA-256 of (model id, text) and evicted least-recently-used
+    EMBEDDING_CACHE_SIZE = 512
+    _embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+    _embedding_cache_lock = threading.Lock()
+
+    # Per-agent cache of retrieval results, keyed by (BLAKE2b(query), top_k)
+    RETRIEVAL_CACHE_SIZE = 256
     
-    def __init__(self, policies: List[Dict[str, Any]], aws_region: str = "us-east-1"):
+    def __init__(self, policies: List[Dict[str, Any]], aws_region: str = "us-east-1",
+                 quantize_embeddings: bool = False):
         """
         Initialize with policies and AWS Bedrock client
         
         Args:
             policies: List of policy dictionaries with 'id', 'title', and 'text' keys
             aws_region: AWS region for Bedrock service
+            quantize_embeddings: Store the policy matrix as int8 with per-row
+                scales (4x smaller than float32) for large policy catalogs
         """
         self.policies = policies
         self.aws_region = aws_region
+        self.quantize_embeddings = quantize_embeddings
+        self._retrieval_cache: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
         
         # Initialize Bedrock client
         try:
             self.bedrock_runtime = boto3.client(
                 service_name='bedrock-runtime',
-                region_name=aws_region
+                region_name=aws_region,
+                config=BEDROCK_CLIENT_CONFIG
             )
         except Exception as e:
             print(f"Warning: Could not initialize Bedrock client: {e}")
@@ -42,30 +93,68 @@ class DisputeResolutionAgent:
 
     def _precompute_policy_embeddings(self) -> List[Dict[str, Any]]:
         """Precompute embeddings for all policies for RAG retrieval"""
+        # Embedding calls are network-bound, so fan them out across threads;
+        # map() keeps the results in policy order
         embeddings = []
-        for policy in self.policies:
-            try:
-                embedding = self._get_embedding(policy.get('text', ''))
-                embeddings.append({
-                    'id': policy.get('id'),
-                    'title': policy.get('title'),
-                    'text': policy.get('text'),
-                    'embedding': embedding
-                })
-            except Exception as e:
-                print(f"Warning: Could not embed policy {policy.get('id')}: {e}")
-                embeddings.append({
-                    'id': policy.get('id'),
-                    'title': policy.get('title'),
-                    'text': policy.get('text'),
-                    'embedding': None
-                })
+        if self.policies:
+            with ThreadPoolExecutor(max_workers=min(16, len(self.policies))) as executor:
+                embeddings = list(executor.map(self._embed_policy, self.policies))
+
+        # Stack the (already normalized) embeddings into one (N, d) matrix so
+        # retrieval is a single matrix-vector product instead of N Python calls
+        self._policy_index = [e for e in embeddings if e['embedding'] is not None]
+        if self._policy_index:
+            self._policy_matrix = np.vstack([e['embedding'] for e in self._policy_index]).astype(np.float32)
+        else:
+            self._policy_matrix = None
+
+        # Symmetric per-row int8 quantization; scores are rescaled at query time
+        self._policy_scales = None
+        if self.quantize_embeddings and self._policy_matrix is not None:
+            scales = np.abs(self._policy_matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._policy_matrix = np.round(self._policy_matrix / scales[:, None]).astype(np.int8)
+            self._policy_scales = scales.astype(np.float32)
+
+        # Inner product on unit vectors is cosine similarity
+        self._faiss_index = None
+        if faiss is not None and self._policy_matrix is not None and self._policy_scales is None:
+            self._faiss_index = faiss.IndexFlatIP(self._policy_matrix.shape[1])
+            self._faiss_index.add(self._policy_matrix)
         return embeddings
 
+    def _embed_policy(self, policy: Dict[str, Any]) -> Dict[str, Any]:
+        """Embed a single policy, recording a None embedding on failure"""
+        try:
+            embedding = self._get_embedding(policy.get('text', ''))
+            if embedding is not None:
+                # Store unit vectors so cosine similarity is a bare dot product
+                norm = np.linalg.norm(embedding)
+                if norm > 0:
+                    embedding = embedding / norm
+        except Exception as e:
+            print(f"Warning: Could not embed policy {policy.get('id')}: {e}")
+            embedding = None
+
+        return {
+            'id': policy.get('id'),
+            'title': policy.get('title'),
+            'text': policy.get('text'),
+            'embedding': embedding
+        }
+
     def _get_embedding(self, text: str) -> Optional[np.ndarray]:
         """Get embedding vector for text using Bedrock Titan embedding model"""
         if not self.bedrock_runtime:
             return None
+
+        # Shared LRU cache: repeated texts skip the Bedrock round-trip entirely
+        key = hashlib.sha256(f"{self.titan_embed_model_id}\0{text}".encode()).digest()
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                self._embedding_cache.move_to_end(key)
+                return cached
             
         try:
             body = json.dumps({"inputText": text})
@@ -75,45 +164,115 @@ class DisputeResolutionAgent:
                 body=body
             )
             
-            response_body = json.loads(response['body'].read())
-            embedding = np.array(response_body['embedding'])
+            if ijson is not None:
+                # Parse the vector straight off the stream without building the full dict
+                embedding = np.fromiter(
+                    ijson.items(response['body'], 'embedding.item', use_float=True),
+                    dtype=np.float32
+                )
+            else:
+                response_body = json_loads(response['body'].read())
+                embedding = np.asarray(response_body['embedding'], dtype=np.float32)
+            embedding.flags.writeable = False
+
+            with self._embedding_cache_lock:
+                self._embedding_cache[key] = embedding
+                self._embedding_cache.move_to_end(key)
+                if len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
             return embedding
         except Exception as e:
             print(f"Error getting embedding: {e}")
             return None
 
     def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors"""
+        """
+        Calculate cosine similarity between two vectors
+
+        Retrieval no longer goes through this helper (policy embeddings are
+        stored normalized); it is kept for ad-hoc comparisons.
+        """
         if a is None or b is None:
             return 0.0
         
-        dot_product = np.dot(a, b)
-        norm_a = np.linalg.norm(a)
-        norm_b = np.linalg.norm(b)
-        
-        if norm_a == 0 or norm_b == 0:
+        # One sqrt over the product of squared norms instead of two norm() calls
+        denominator = np.sqrt(np.vdot(a, a) * np.vdot(b, b))
+        if denominator == 0:
             return 0.0
             
-        return dot_product / (norm_a * norm_b)
+        return float(np.dot(a, b) / denominator)
 
     def _retrieve_relevant_policies(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """Retrieve most relevant policies using semantic search"""
+        # Policies are fixed after init, so rankings can be reused per query
+        key = (hashlib.blake2b(query.encode(), digest_size=16).digest(), top_k)
+        cached = self._retrieval_cache.get(key)
+        if cached is not None:
+            self._retrieval_cache.move_to_end(key)
+            return list(cached)
+
         query_embedding = self._get_embedding(query)
         if query_embedding is None:
-            return self.policy_embeddings[:top_k]  # Fallback to first k policies
-        
-        similarities = []
-        for policy_data in self.policy_embeddings:
-            if policy_data['embedding'] is not None:
-                similarity = self._cosine_similarity(query_embedding, policy_data['embedding'])
-                similarities.append((similarity, policy_data))
-        
-        # Sort by similarity and return top k
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        return [policy_data for _, policy_data in similarities[:top_k]]
+            return self.policy_embeddings[:top_k]  # Fallback to first k policies (not cached)
+
+        results = self._rank_policies(query_embedding, top_k)
+        self._retrieval_cache[key] = results
+        if len(self._retrieval_cache) > self.RETRIEVAL_CACHE_SIZE:
+            self._retrieval_cache.popitem(last=False)
+        return list(results)
+
+    def _rank_policies(self, query_embedding: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Rank policies against a query embedding by cosine similarity"""
+        if self._policy_matrix is None:
+            return []
+
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q_norm = np.linalg.norm(q)
+        if q_norm > 0:
+            q = q / q_norm
+
+        if self._faiss_index is not None:
+            k = min(top_k, self._faiss_index.ntotal)
+            if k <= 0:
+                return []
+            _, indices = self._faiss_index.search(q.reshape(1, -1), k)
+            return [self._policy_index[i] for i in indices[0] if i >= 0]
+
+        if simsimd is not None and self._policy_scales is None:
+            distances = simsimd.cdist(q.reshape(1, -1), self._policy_matrix, metric='cosine')
+            similarities = 1.0 - np.asarray(distances)[0]
+        else:
+            similarities = self._policy_matrix @ q
+            if self._policy_scales is not None:
+                similarities *= self._policy_scales
+
+        return [self._policy_index[i] for i in self._top_k_indices(similarities, top_k)]
 
-    def _invoke_claude(self, prompt: str, max_tokens: int = 1000) -> str:
-        """Invoke Claude model on Bedrock"""
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Indices of the top_k highest scores, best first, in O(N + k log k)"""
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k == len(scores):
+            return np.argsort(-scores, kind='stable')
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind='stable')]
+
+    def _invoke_claude(self, prompt: str, max_tokens: int = 1000,
+                       on_text: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Invoke Claude model on Bedrock, streaming the response
+
+        Args:
+            prompt: User prompt
+            max_tokens: Generation limit
+            on_text: Optional callback receiving each text delta as it arrives
+
+        Returns:
+            The full generated text
+        """
         if not self.bedrock_runtime:
             return "Bedrock client not available"
         
@@ -129,14 +288,21 @@ class DisputeResolutionAgent:
                 ]
             })
             
-            response = self.bedrock_runtime.invoke_model(
+            response = self.bedrock_runtime.invoke_model_with_response_stream(
                 modelId=self.claude_model_id,
                 contentType="application/json",
                 body=body
             )
             
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            parts = []
+            for event in response['body']:
+                chunk = json_loads(event['chunk']['bytes'])
+                if chunk.get('type') == 'content_block_delta':
+                    text = chunk['delta'].get('text', '')
+                    parts.append(text)
+                    if on_text:
+                        on_text(text)
+            return ''.join(parts)
         except Exception as e:
             print(f"Error invoking Claude: {e}")
             return f"Error: {str(e)}"
@@ -167,16 +333,10 @@ class DisputeResolutionAgent:
         
         response = self._invoke_claude(prompt, max_tokens=10)
         
-        # Extract and normalize the classification
+        # Extract and normalize the classification; labels are checked in
+        # priority order, falling back to billing
         classification = response.strip().lower()
-        if 'fraud' in classification:
-            return 'fraud'
-        elif 'billing' in classification:
-            return 'billing'
-        elif 'service' in classification:
-            return 'service'
-        else:
-            return 'billing'  # Default fallback
+        return next((label for label in self.DISPUTE_LABELS if label in classification), 'billing')
 
     def suggest_next_action(self, dispute_type: str, transaction_history: str = "", customer_interactions: str = "") -> str:
         """
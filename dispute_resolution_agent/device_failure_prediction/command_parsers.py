@@ -0,0 +1,38 @@
+# Each command's output is reduced to a few counts at collection time
+def _rows(output):
+    if output.startswith("ERROR"):
+        return []
+    return [line.split() for line in output.splitlines() if line.strip()]
+
+def parse_bgp(output):
+    # Neighbor rows start with the peer IP; State/PfxRcd is numeric once Established
+    peers = [f for f in _rows(output) if f[0][0].isdigit()]
+    return len(peers), sum(f[-1].isdigit() for f in peers)
+
+def parse_eigrp(output):
+    return (sum(f[0].isdigit() for f in _rows(output)),)
+
+def parse_hsrp(output):
+    rows = _rows(output)
+    return sum("Active" in f for f in rows), sum("Standby" in f for f in rows)
+
+def parse_bfd(output):
+    rows = _rows(output)
+    return sum("Up" in f for f in rows), sum("Down" in f for f in rows)
+
+def parse_int(output):
+    # Last column is the line protocol status
+    rows = [f for f in _rows(output) if f[-1] in ("up", "down")]
+    return sum(f[-1] == "up" for f in rows), sum(f[-1] == "down" for f in rows)
+
+parsers = {
+"bgp": (("bgp_neighbors", "bgp_established"), parse_bgp),
+"eigrp": (("eigrp_neighbors",), parse_eigrp),
+"hsrp": (("hsrp_active", "hsrp_standby"), parse_hsrp),
+"bfd": (("bfd_up", "bfd_down"), parse_bfd),
+"int": (("int_up", "int_down"), parse_int),
+}
+
+def add_features(row, proto, output):
+    names, parse = parsers[proto]
+    row.update(zip(names, parse(output)))
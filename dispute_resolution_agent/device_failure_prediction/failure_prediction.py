@@ -1,8 +1,11 @@
 import time
 import paramiko
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from command_parsers import add_features
 
 
 devices = [
@@ -18,32 +21,36 @@ commands = {
 "int": "show ip interface brief | include up|down",
 }
 
-def run_command(ip, username, password, cmd):
+def run_all(device):
+    # One SSH session per device; every command runs over it
+    row = {"device": device["name"], "timestamp": datetime.now()}
+    ssh = paramiko.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     try:
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(ip, username=username, password=password, timeout=10)
-        stdin, stdout, stderr = ssh.exec_command(cmd)
-        output = stdout.read().decode()
-        ssh.close()
-        return output.strip()
+        ssh.connect(device["ip"], username=device["username"], password=device["password"], timeout=10)
+        for proto, cmd in commands.items():
+            try:
+                stdin, stdout, stderr = ssh.exec_command(cmd)
+                add_features(row, proto, stdout.read().decode().strip())
+            except Exception as e:
+                add_features(row, proto, f"ERROR: {e}")
     except Exception as e:
-        return f"ERROR: {e}"
+        for proto in commands:
+            add_features(row, proto, f"ERROR: {e}")
+    finally:
+        ssh.close()
+    return row
 
 def collect_status():
-    rows = []
-    for device in devices:
-    row = {"device": device["name"], "timestamp": datetime.now()}
-    for proto, cmd in commands.items():
-    row[proto] = run_command(device["ip"], device["username"], device["password"], cmd)
-    rows.append(row)
-    return rows
+    # Devices are polled concurrently; paramiko releases the GIL on socket I/O
+    with ThreadPoolExecutor(max_workers=len(devices)) as ex:
+        return list(ex.map(run_all, devices))
 
 def predict_anomalies(df):
     model = IsolationForest(contamination=0.1, random_state=42)
-    features = df.drop(columns=["device", "timestamp"])
-    features_encoded = features.apply(lambda x: pd.factorize(x)[0]) # Encode text
-    df["anomaly"] = model.fit_predict(features_encoded)
+    # Features are already numeric counts, so no text encoding is needed
+    features = df.drop(columns=["device", "timestamp"]).to_numpy(dtype=np.int32)
+    df["anomaly"] = model.fit_predict(features)
     return df
 
 all_data = []
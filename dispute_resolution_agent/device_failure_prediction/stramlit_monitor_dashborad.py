@@ -1,14 +1,16 @@
-
 import time
+from collections import deque
+import numpy as np
 import streamlit as st
 import pandas as pd
 import paramiko
 from datetime import datetime
 from sklearn.ensemble import IsolationForest
+from command_parsers import parsers
 
------------------------------
-Device Inventory
------------------------------
+# -----------------------------
+# Device Inventory
+# -----------------------------
 devices = [
 {"name": "R1", "ip": "192.168.1.1", "username": "admin", "password": "cisco"},
 {"name": "R2", "ip": "192.168.1.2", "username": "admin", "password": "cisco"},
@@ -22,63 +24,86 @@ commands = {
 "int": "show ip interface brief | include up|down",
 }
 
------------------------------
-SSH Function
------------------------------
+# Rows kept in memory and used to fit the model, and ticks between refits
+WINDOW = 500
+REFIT_EVERY = 10
+
+# -----------------------------
+# SSH Function
+# -----------------------------
 def run_command(ip, username, password, cmd):
-try:
-ssh = paramiko.SSHClient()
-ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect(ip, username=username, password=password, timeout=10)
-stdin, stdout, stderr = ssh.exec_command(cmd)
-output = stdout.read().decode()
-ssh.close()
-return output.strip()
-except Exception as e:
-return f"ERROR: {e}"
+    try:
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        ssh.connect(ip, username=username, password=password, timeout=10)
+        stdin, stdout, stderr = ssh.exec_command(cmd)
+        output = stdout.read().decode()
+        ssh.close()
+        return output.strip()
+    except Exception as e:
+        return f"ERROR: {e}"
 
 def collect_status():
-rows = []
-for device in devices:
-row = {"device": device["name"], "timestamp": datetime.now()}
-for proto, cmd in commands.items():
-row[proto] = run_command(device["ip"], device["username"], device["password"], cmd)
-rows.append(row)
-return rows
-
-def predict_anomalies(df):
-model = IsolationForest(contamination=0.1, random_state=42)
-features = df.drop(columns=["device", "timestamp"])
-features_encoded = features.apply(lambda x: pd.factorize(x)[0])
-df["anomaly"] = model.fit_predict(features_encoded)
-return df
-
------------------------------
-Streamlit Dashboard
------------------------------
+    rows = []
+    for device in devices:
+        row = {"device": device["name"], "timestamp": datetime.now()}
+        for proto, cmd in commands.items():
+            row[proto] = run_command(device["ip"], device["username"], device["password"], cmd)
+        rows.append(row)
+    return rows
+
+# -----------------------------
+# Anomaly Detection
+# -----------------------------
+# The model sees the parsed counts for each protocol; the raw output stays
+# in the rows for display
+def encode_rows(rows):
+    return np.array([[value for proto in commands for value in parsers[proto][1](row[proto])]
+                     for row in rows], dtype=np.int32)
+
+def fit_model(encoded):
+    # Fit on the rolling window only, not on the whole history
+    model = IsolationForest(contamination=0.1, random_state=42)
+    model.fit(encoded)
+    return model
+
+# -----------------------------
+# Streamlit Dashboard
+# -----------------------------
 st.set_page_config(page_title="Network Health Dashboard", layout="wide")
 
 st.title("🌐 Network Failure Prediction Dashboard")
 st.markdown("Monitor BGP, EIGRP, HSRP, BFD, and Interfaces in real time.")
 
 placeholder = st.empty()
-data_log = []
+data_log = deque(maxlen=WINDOW)
+encoded_log = deque(maxlen=WINDOW)
+model = None
+tick = 0
 
 refresh_rate = st.sidebar.slider("Refresh Interval (seconds)", 5, 60, 10)
 
 while True:
-new_data = collect_status()
-data_log.extend(new_data)
-df = pd.DataFrame(data_log)
-df = predict_anomalies(df)
+    new_data = collect_status()
+    new_encoded = encode_rows(new_data)
+    data_log.extend(new_data)
+    encoded_log.extend(new_encoded)
+
+    if model is None or tick % REFIT_EVERY == 0:
+        model = fit_model(np.vstack(encoded_log))
+    # Score only the rows collected this tick
+    for row, label in zip(new_data, model.predict(new_encoded)):
+        row["anomaly"] = int(label)
+    df = pd.DataFrame(list(data_log))
+    tick += 1
 
-with placeholder.container():
-    st.subheader("📊 Live Device Status")
-    st.dataframe(df.tail(len(devices)))
+    with placeholder.container():
+        st.subheader("📊 Live Device Status")
+        st.dataframe(df.tail(len(devices)))
 
-    st.subheader("⚠️ Predicted Anomalies")
-    st.dataframe(df[df["anomaly"] == -1])
+        st.subheader("⚠️ Predicted Anomalies")
+        st.dataframe(df[df["anomaly"] == -1])
 
-    st.line_chart(df.groupby("timestamp")["anomaly"].sum())
+        st.line_chart(df.groupby("timestamp")["anomaly"].sum())
 
-time.sleep(refresh_rate)
+    time.sleep(refresh_rate)
@@ -3,21 +3,45 @@ Complete Personal Finance Assistant Integration Demo
 Shows real-world usage with statement parsing and RAG integration
 """
 
+import io
 import sys
 import os
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TextIO, Tuple
+import numpy as np
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from finance_assistant.personal_finance_ai import PersonalFinanceAssistant
 from finance_assistant.statement_parser import StatementParser, parse_statement_from_text
 from finance_assistant.sample_financial_data import sample_user_goals
+from finance_assistant.semantic_cache import SemanticCache
 
-def demo_statement_parsing():
+if TYPE_CHECKING:
+    from finance_assistant.personal_finance_ai import PersonalFinanceAssistant
+
+# Question-embedding caches for retrieved docs and for Claude answers
+_retrieval_cache = SemanticCache(threshold=0.95)
+_response_cache = SemanticCache(threshold=0.95)
+
+# Row templates for the CSV transaction listing and category totals
+TRANSACTION_ROW = "   {index}. {date} - {merchant} - ${amount:,.2f}"
+CATEGORY_TOTAL_ROW = "   {category}: ${amount:,.2f}"
+
+@functools.lru_cache(maxsize=1)
+def _assistant(aws_region: str = "us-east-1") -> "PersonalFinanceAssistant":
+    """Shared assistant so the Bedrock client and doc embeddings are built once per process"""
+    # Imported here so sections that never call Bedrock skip loading boto3
+    from finance_assistant.personal_finance_ai import PersonalFinanceAssistant
+    return PersonalFinanceAssistant(aws_region=aws_region)
+
+def demo_statement_parsing(out: Optional[TextIO] = None):
     """Demonstrate parsing a real statement format"""
-    print("=" * 70)
-    print("📄 STATEMENT PARSING DEMO")
-    print("=" * 70)
+    print("=" * 70, file=out)
+    print("📄 STATEMENT PARSING DEMO", file=out)
+    print("=" * 70, file=out)
     
     # Sample statement text (as might come from OCR or copy-paste)
     raw_statement = """
@@ -51,21 +75,21 @@ def demo_statement_parsing():
     parser = StatementParser()
     parsed_data = parser.parse_statement_text(raw_statement)
     
-    print("✅ Statement parsed successfully!")
-    print(f"📊 Extracted Data:")
+    print("✅ Statement parsed successfully!", file=out)
+    print(f"📊 Extracted Data:", file=out)
     for key, value in parsed_data.items():
         if isinstance(value, (int, float)):
-            print(f"   {key.replace('_', ' ').title()}: ${value:,.2f}")
-        elif key not in ['raw_text', 'parsing_method']:
-            print(f"   {key.replace('_', ' ').title()}: {value}")
+            print(f"   {key.replace('_', ' ').title()}: ${value:,.2f}", file=out)
+        elif key not in ['raw_text_digest', 'parsing_method']:
+            print(f"   {key.replace('_', ' ').title()}: {value}", file=out)
     
     return parsed_data
 
-def demo_csv_transaction_parsing():
+def demo_csv_transaction_parsing(out: Optional[TextIO] = None):
     """Demonstrate parsing transaction CSV data"""
-    print(f"\n" + "=" * 70)
-    print("💳 TRANSACTION CSV PARSING DEMO")
-    print("=" * 70)
+    print(f"\n" + "=" * 70, file=out)
+    print("💳 TRANSACTION CSV PARSING DEMO", file=out)
+    print("=" * 70, file=out)
     
     # Sample CSV data
     csv_data = """Date,Description,Amount,Category
@@ -81,32 +105,34 @@ def demo_csv_transaction_parsing():
 09/22/2025,Marriott Hotel,-148.00,Travel"""
     
     parser = StatementParser()
-    transactions = parser.parse_csv_transactions(csv_data)
+    # Parse and total by category in one pass over the rows
+    transactions, categories = parser.parse_and_categorize_csv(csv_data)
     
-    print(f"✅ Parsed {len(transactions)} transactions")
-    print(f"📊 Sample Transactions:")
+    print(f"✅ Parsed {len(transactions)} transactions", file=out)
+    print(f"📊 Sample Transactions:", file=out)
     for i, tx in enumerate(transactions[:3], 1):
-        print(f"   {i}. {tx['date']} - {tx['merchant']} - ${abs(tx['amount']):,.2f}")
+        print(TRANSACTION_ROW.format_map({'index': i, 'date': tx['date'], 'merchant': tx['merchant'],
+                                          'amount': abs(tx['amount'])}), file=out)
     
-    # Categorize transactions
-    categories = parser.categorize_transactions(transactions)
-    print(f"\n📈 Spending by Category:")
-    for category, amount in sorted(categories.items(), key=lambda x: x[1], reverse=True):
-        print(f"   {category}: ${amount:,.2f}")
+    print(f"\n📈 Spending by Category:", file=out)
+    labels = list(categories.keys())
+    amounts = np.fromiter(categories.values(), dtype=np.float64, count=len(categories))
+    for i in np.argsort(-amounts, kind='stable').tolist():
+        print(CATEGORY_TOTAL_ROW.format_map({'category': labels[i], 'amount': amounts[i]}), file=out)
     
     return transactions, categories
 
-def demo_integrated_analysis():
+def demo_integrated_analysis(out: Optional[TextIO] = None):
     """Show complete integration: parsing + AI analysis + recommendations"""
-    print(f"\n" + "=" * 70)
-    print("🤖 INTEGRATED AI ANALYSIS")
-    print("=" * 70)
+    print(f"\n" + "=" * 70, file=out)
+    print("🤖 INTEGRATED AI ANALYSIS", file=out)
+    print("=" * 70, file=out)
     
     # Parse statement (from previous demo)
-    parsed_statement = demo_statement_parsing()
+    parsed_statement = demo_statement_parsing(out)
     
     # Parse transactions 
-    transactions, categories = demo_csv_transaction_parsing()
+    transactions, categories = demo_csv_transaction_parsing(out)
     
     # Add parsed transaction categories to statement
     parsed_statement['spending_categories'] = categories
@@ -114,37 +140,37 @@ def demo_integrated_analysis():
     parsed_statement['rewards_earned'] = 21804  # Points from spending
     
     # Initialize AI assistant
-    assistant = PersonalFinanceAssistant()
+    assistant = _assistant()
     
-    print(f"\n🧠 Generating AI-Powered Insights...")
+    print(f"\n🧠 Generating AI-Powered Insights...", file=out)
     
     # Generate complete analysis
     report = assistant.generate_financial_report(parsed_statement, sample_user_goals)
     
-    print(f"\n📖 AI EXPLANATION:")
-    print("-" * 50)
-    print(report['statement_explanation'])
+    print(f"\n📖 AI EXPLANATION:", file=out)
+    print("-" * 50, file=out)
+    print(report['statement_explanation'], file=out)
     
-    print(f"\n💡 SMART NUDGES:")
-    print("-" * 50)
+    print(f"\n💡 SMART NUDGES:", file=out)
+    print("-" * 50, file=out)
     for i, nudge in enumerate(report['personalized_nudges'], 1):
-        print(f"{i}. {nudge}")
+        print(f"{i}. {nudge}", file=out)
     
-    print(f"\n🔮 SCENARIO PLANNING:")
-    print("-" * 50)
+    print(f"\n🔮 SCENARIO PLANNING:", file=out)
+    print("-" * 50, file=out)
     for scenario, analysis in report['scenario_analysis'].items():
-        print(f"\n{scenario}:")
-        print(f"   {analysis['summary']}")
+        print(f"\n{scenario}:", file=out)
+        print(f"   {analysis['summary']}", file=out)
     
     return report
 
-def demo_rag_financial_advice():
+def demo_rag_financial_advice(out: Optional[TextIO] = None):
     """Demonstrate RAG-powered financial advice"""
-    print(f"\n" + "=" * 70)
-    print("📚 RAG-POWERED FINANCIAL ADVICE")
-    print("=" * 70)
+    print(f"\n" + "=" * 70, file=out)
+    print("📚 RAG-POWERED FINANCIAL ADVICE", file=out)
+    print("=" * 70, file=out)
     
-    assistant = PersonalFinanceAssistant()
+    assistant = _assistant()
     
     # Sample user questions
     questions = [
@@ -154,18 +180,87 @@ def demo_rag_financial_advice():
         "Should I focus on building an emergency fund or paying off debt?"
     ]
     
-    print("🤔 User Questions & AI Responses:")
-    for i, question in enumerate(questions, 1):
-        print(f"\n{i}. Q: {question}")
+    # Fallback responses
+    fallback_responses = {
+        0: "Focus on paying more than the minimum payment to reduce interest charges. Every extra dollar goes directly toward principal.",
+        1: "Use the debt avalanche method: pay minimums on all cards, then put extra money toward the highest interest rate debt first.", 
+        2: "Always pay your full balance to avoid interest, which negates reward value. Focus on bonus categories and sign-up bonuses.",
+        3: "If credit card interest is above 15%, prioritize debt payoff. Build a small emergency fund ($1,000) first, then tackle debt aggressively."
+    }
+    
+    responses = {}
+    pending = []
+    for i, question in enumerate(questions):
+        # Embed once; near-duplicate questions reuse cached docs and answers
+        question_embedding = assistant._get_embedding(question)
         
         # Use retrieval to find relevant docs
-        relevant_docs = assistant._retrieve_relevant_docs(question, top_k=2)
+        relevant_docs = _retrieval_cache.get(question_embedding)
+        if relevant_docs is None:
+            relevant_docs = assistant._retrieve_relevant_docs(question, top_k=2, query_embedding=question_embedding)
+            _retrieval_cache.set(question_embedding, relevant_docs)
         
-        # Create context for AI response
-        context = "\n".join([f"- {doc['title']}: {doc['content'][:100]}..." for doc in relevant_docs])
+        if not assistant.bedrock_runtime:
+            responses[i] = fallback_responses.get(i, "Consult with a financial advisor for personalized advice.")
+            continue
+        
+        cached = _response_cache.get(question_embedding)
+        if cached is not None:
+            responses[i] = cached
+            continue
         
-        if assistant.bedrock_runtime:
-            prompt = f"""
+        # Create context for AI response
+        context = _format_context(relevant_docs)
+        pending.append((i, question, context, question_embedding))
+    
+    # Answer every uncached question with a single Claude request
+    if pending:
+        answers = _answer_questions(assistant, [(question, context) for _, question, context, _ in pending])
+        for (i, _, _, question_embedding), response in zip(pending, answers):
+            responses[i] = response
+            if not response.startswith("Error"):
+                _response_cache.set(question_embedding, response)
+    
+    print("🤔 User Questions & AI Responses:", file=out)
+    for i, question in enumerate(questions):
+        print(f"\n{i + 1}. Q: {question}", file=out)
+        print(f"   A: {responses[i]}", file=out)
+
+def _format_context(docs: List[Dict[str, Any]], width: int = 100) -> str:
+    """Render docs as "- title: content..." lines, truncating content to width characters"""
+    if not docs:
+        return ""
+    titles = np.array([doc['title'] for doc in docs], dtype=str)
+    # Casting to a fixed-width dtype truncates every content in one call
+    contents = np.array([doc['content'] for doc in docs], dtype=str).astype(f'U{width}')
+    lines = np.char.add(np.char.add(np.char.add("- ", titles), ": "), np.char.add(contents, "..."))
+    return "\n".join(lines.tolist())
+
+def _answer_questions(assistant: "PersonalFinanceAssistant", items: List[Tuple[str, str]]) -> List[str]:
+    """
+    Answer (question, context) pairs in one Claude call, asking for a JSON list
+    of answers; falls back to one call per question if the reply is unusable
+    """
+    prompt = f"""
+    Answer each personal finance question using its provided context.
+    Give a helpful, practical answer in 1-2 sentences per question.
+    
+    Questions: {json.dumps([{"question": q, "context": c} for q, c in items])}
+    
+    Return only a JSON list of {len(items)} answer strings, in the same order:
+    """
+    reply = assistant._invoke_claude(prompt, max_tokens=150 * len(items))
+    if reply.startswith("Error"):
+        return [reply] * len(items)
+    try:
+        answers = json.loads(reply[reply.index('['):reply.rindex(']') + 1])
+        if len(answers) == len(items) and all(isinstance(a, str) for a in answers):
+            return answers
+    except ValueError:
+        pass
+    
+    return [
+        assistant._invoke_claude(f"""
             Answer this personal finance question using the provided context:
             
             Question: {question}
@@ -173,27 +268,17 @@ def demo_rag_financial_advice():
             Context: {context}
             
             Provide a helpful, practical answer in 1-2 sentences:
-            """
-            response = assistant._invoke_claude(prompt, max_tokens=150)
-        else:
-            # Fallback responses
-            fallback_responses = {
-                0: "Focus on paying more than the minimum payment to reduce interest charges. Every extra dollar goes directly toward principal.",
-                1: "Use the debt avalanche method: pay minimums on all cards, then put extra money toward the highest interest rate debt first.", 
-                2: "Always pay your full balance to avoid interest, which negates reward value. Focus on bonus categories and sign-up bonuses.",
-                3: "If credit card interest is above 15%, prioritize debt payoff. Build a small emergency fund ($1,000) first, then tackle debt aggressively."
-            }
-            response = fallback_responses.get(i-1, "Consult with a financial advisor for personalized advice.")
-        
-        print(f"   A: {response}")
+            """, max_tokens=150)
+        for question, context in items
+    ]
 
-def demo_spending_scenario_simulator():
+def demo_spending_scenario_simulator(out: Optional[TextIO] = None):
     """Advanced spending change simulation"""
-    print(f"\n" + "=" * 70)
-    print("📊 ADVANCED SCENARIO SIMULATOR")
-    print("=" * 70)
+    print(f"\n" + "=" * 70, file=out)
+    print("📊 ADVANCED SCENARIO SIMULATOR", file=out)
+    print("=" * 70, file=out)
     
-    assistant = PersonalFinanceAssistant()
+    assistant = _assistant()
     
     # Current financial state
     current_state = {
@@ -232,18 +317,26 @@ def demo_spending_scenario_simulator():
         }
     ]
     
-    print("🎯 Scenario Analysis Results:")
+    print("🎯 Scenario Analysis Results:", file=out)
+    
+    # Simulate every scenario in one call
+    analysis = assistant.simulate_spending_changes(current_state, scenarios)
     
     for scenario in scenarios:
-        analysis = assistant.simulate_spending_changes(current_state, [scenario])
         result = analysis[scenario['name']]
         
-        print(f"\n{scenario['name']}:")
-        print(f"   Goal: {scenario['goal']}")
-        print(f"   {result['summary']}")
+        print(f"\n{scenario['name']}:", file=out)
+        print(f"   Goal: {scenario['goal']}", file=out)
+        print(f"   {result['summary']}", file=out)
         
         if 'interest_saved' in result:
-            print(f"   💰 Bonus: ${result['interest_saved']:,.0f} saved in interest!")
+            print(f"   💰 Bonus: ${result['interest_saved']:,.0f} saved in interest!", file=out)
+
+def _run_buffered(section: Callable[..., Any]) -> io.StringIO:
+    """Run a demo section with its output captured in a buffer"""
+    buf = io.StringIO()
+    section(out=buf)
+    return buf
 
 def main():
     """Run the complete integrated demo"""
@@ -257,10 +350,14 @@ def main():
     print("• Scenario planning and simulation")
     
     try:
-        # Run all demo components
-        demo_integrated_analysis()
-        demo_rag_financial_advice()  
-        demo_spending_scenario_simulator()
+        # Build the shared assistant (and its client) up front, then run the
+        # Bedrock-bound sections concurrently, each into its own buffer
+        _assistant().bedrock_runtime
+        sections = [demo_integrated_analysis, demo_rag_financial_advice, demo_spending_scenario_simulator]
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            buffers = list(executor.map(_run_buffered, sections))
+        # Flush in section order so output reads as if run sequentially
+        sys.stdout.write("".join(buf.getvalue() for buf in buffers))
         
         print(f"\n" + "=" * 70)
         print("✅ COMPLETE INTEGRATION DEMO FINISHED")
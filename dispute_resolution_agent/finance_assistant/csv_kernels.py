@@ -0,0 +1,87 @@
+"""
+Numeric kernels for parsing large CSV exports
+Compiled with Numba when it is installed, plain Python otherwise
+"""
+
+from typing import List
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Exact powers of ten; mantissa / 10**k is then correctly rounded, like float()
+_POWERS_OF_TEN = np.array([float(10 ** k) for k in range(23)])
+
+
+@njit(cache=True)
+def _parse_amount(buf, start, end, powers):
+    """
+    Parse one amount field from UTF-8 bytes, dropping '$', ',' and ')' and
+    treating a leading '(' or '-' as the sign
+
+    Returns NaN for anything float() might read differently (exponents,
+    '+', whitespace, more than 15 digits), so the caller can fall back
+    """
+    negative = False
+    seen_point = False
+    mantissa = 0
+    digits = 0
+    frac_digits = 0
+    for j in range(start, end):
+        c = int(buf[j])
+        if 48 <= c <= 57:
+            if digits == 15:
+                return np.nan
+            mantissa = mantissa * 10 + (c - 48)
+            digits += 1
+            if seen_point:
+                frac_digits += 1
+        elif c == 36 or c == 44 or c == 41:
+            continue
+        elif c == 40 or c == 45:
+            if negative or digits or seen_point:
+                return np.nan
+            negative = True
+        elif c == 46 and not seen_point:
+            seen_point = True
+        else:
+            return np.nan
+    if digits == 0:
+        return np.nan
+    value = mantissa / powers[frac_digits]
+    return -value if negative else value
+
+
+@njit(cache=True)
+def parse_amounts(buf, starts, ends, powers):
+    """Parse the amount fields at buf[starts[i]:ends[i]] into a float64 column"""
+    out = np.empty(starts.shape[0], dtype=np.float64)
+    for i in range(starts.shape[0]):
+        out[i] = _parse_amount(buf, starts[i], ends[i], powers)
+    return out
+
+
+def parse_amount_column(values: List[str]) -> np.ndarray:
+    """
+    Parse a column of amount strings in one compiled pass
+
+    Args:
+        values: Raw amount strings (e.g. "$1,234.56", "(12.00)")
+
+    Returns:
+        float64 array; NaN where the value needs the regular Python parse
+    """
+    encoded = [value.encode() for value in values]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    ends = np.cumsum(lengths)
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return parse_amounts(buf, ends - lengths, ends, _POWERS_OF_TEN)
@@ -5,16 +5,29 @@ Shows how to analyze statements, generate nudges, and simulate scenarios
 
 import sys
 import os
+import functools
 import json
+from typing import TYPE_CHECKING
+import numpy as np
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from finance_assistant.personal_finance_ai import PersonalFinanceAssistant
+from finance_assistant.payoff_kernels import payoff
 from finance_assistant.sample_financial_data import (
     sample_statement_september, sample_user_goals, common_scenarios, user_persona_debt_focused
 )
 
+if TYPE_CHECKING:
+    from finance_assistant.personal_finance_ai import PersonalFinanceAssistant
+
+@functools.lru_cache(maxsize=1)
+def _assistant(aws_region: str = "us-east-1") -> "PersonalFinanceAssistant":
+    """Lazily built assistant shared by every demo section"""
+    # Imported here so sections that never call Bedrock skip loading boto3
+    from finance_assistant.personal_finance_ai import PersonalFinanceAssistant
+    return PersonalFinanceAssistant(aws_region=aws_region)
+
 def demo_statement_analysis():
     """Demonstrate statement analysis and explanation"""
     print("=" * 70)
@@ -22,7 +35,7 @@ def demo_statement_analysis():
     print("=" * 70)
     
     # Initialize the assistant
-    assistant = PersonalFinanceAssistant(aws_region="us-east-1")
+    assistant = _assistant()
     
     print(f"\n📊 Analyzing September 2025 Statement...")
     print(f"Customer: {user_persona_debt_focused['name']}")
@@ -65,55 +78,66 @@ def demo_statement_analysis():
         if 'new_balance' in analysis:
             print(f"   💳 New Balance: ${analysis['new_balance']:,.2f}")
 
+# Row templates for the category breakdown and payoff tables, built once
+CATEGORY_ROW = "   {category:.<25} ${amount:>8,.2f} ({percentage:4.1f}%)"
+PAYOFF_ROW = "{label:<20} {months:>6.0f}   ${interest:>10,.0f}     ${paid:>10,.0f}"
+NEVER_PAID_ROW = "{label:<20} " + f"{'Never':>6}   ${'∞':>10}        ${'∞':>10}"
+
 def demo_spending_categories():
     """Demonstrate spending category analysis"""
-    print(f"\n" + "="*70)
-    print("📊 SPENDING BREAKDOWN ANALYSIS")
-    print("="*70)
+    lines = []
+    lines.append(f"\n" + "="*70)
+    lines.append("📊 SPENDING BREAKDOWN ANALYSIS")
+    lines.append("="*70)
     
     statement = sample_statement_september
     categories = statement['spending_categories']
     total_spending = sum(categories.values())
     
-    print(f"\nTotal Monthly Spending: ${total_spending:,.2f}")
-    print(f"\nCategory Breakdown:")
+    lines.append(f"\nTotal Monthly Spending: ${total_spending:,.2f}")
+    lines.append(f"\nCategory Breakdown:")
     
-    # Sort categories by amount
-    sorted_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)
+    # Sort categories by amount; a stable argsort keeps ties in insertion order
+    labels = list(categories.keys())
+    amounts = np.fromiter(categories.values(), dtype=np.float64, count=len(categories))
+    order = np.argsort(-amounts, kind='stable')
+    sorted_categories = [(labels[i], amounts[i]) for i in order.tolist()]
     
     for category, amount in sorted_categories:
         percentage = (amount / total_spending) * 100
-        print(f"   {category:.<25} ${amount:>8,.2f} ({percentage:4.1f}%)")
+        lines.append(CATEGORY_ROW.format_map({'category': category, 'amount': amount, 'percentage': percentage}))
     
     # Identify insights
-    print(f"\n💡 Spending Insights:")
+    lines.append(f"\n💡 Spending Insights:")
     highest_category, highest_amount = sorted_categories[0]
     if highest_amount > total_spending * 0.25:
-        print(f"   • {highest_category} is your largest expense at {(highest_amount/total_spending)*100:.0f}% of spending")
+        lines.append(f"   • {highest_category} is your largest expense at {(highest_amount/total_spending)*100:.0f}% of spending")
     
     dining_amount = categories.get('Dining & Restaurants', 0)
     if dining_amount > 400:
         monthly_savings = dining_amount * 0.3  # 30% reduction
         annual_savings = monthly_savings * 12
-        print(f"   • Reducing dining out by 30% could save ${monthly_savings:.0f}/month (${annual_savings:,.0f}/year)")
+        lines.append(f"   • Reducing dining out by 30% could save ${monthly_savings:.0f}/month (${annual_savings:,.0f}/year)")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demo_interest_calculations():
     """Demonstrate interest and payoff calculations"""
-    print(f"\n" + "="*70)
-    print("💰 DEBT PAYOFF & INTEREST ANALYSIS")
-    print("="*70)
+    lines = []
+    lines.append(f"\n" + "="*70)
+    lines.append("💰 DEBT PAYOFF & INTEREST ANALYSIS")
+    lines.append("="*70)
     
-    assistant = PersonalFinanceAssistant()
     statement = sample_statement_september
     
     current_balance = statement['current_balance']
     minimum_payment = statement['minimum_payment']
     interest_rate = statement['interest_rate']
     
-    print(f"\nCurrent Situation:")
-    print(f"   Balance: ${current_balance:,.2f}")
-    print(f"   Minimum Payment: ${minimum_payment:,.2f}")
-    print(f"   Interest Rate: {interest_rate*100:.2f}% APR")
+    lines.append(f"\nCurrent Situation:")
+    lines.append(f"   Balance: ${current_balance:,.2f}")
+    lines.append(f"   Minimum Payment: ${minimum_payment:,.2f}")
+    lines.append(f"   Interest Rate: {interest_rate*100:.2f}% APR")
     
     # Calculate payoff scenarios
     scenarios = [
@@ -123,56 +147,64 @@ def demo_interest_calculations():
         {"payment": minimum_payment + 500, "label": "Minimum + $500"}
     ]
     
-    print(f"\n📊 Payoff Scenarios:")
-    print(f"{'Strategy':<20} {'Months':<8} {'Total Interest':<15} {'Total Paid'}")
-    print("-" * 60)
+    lines.append(f"\n📊 Payoff Scenarios:")
+    lines.append(f"{'Strategy':<20} {'Months':<8} {'Total Interest':<15} {'Total Paid'}")
+    lines.append("-" * 60)
     
     for scenario in scenarios:
         payment = scenario['payment']
-        months = assistant._calculate_payoff_time(current_balance, payment, interest_rate)
-        total_interest = assistant._calculate_total_interest(current_balance, payment, interest_rate, int(months))
+        # Single fused pass computes both the payoff time and the interest paid
+        months, total_interest = payoff(current_balance, payment, interest_rate)
         total_paid = current_balance + total_interest
         
         if months < 100:  # Reasonable timeframe
-            print(f"{scenario['label']:<20} {months:>6.0f}   ${total_interest:>10,.0f}     ${total_paid:>10,.0f}")
+            lines.append(PAYOFF_ROW.format_map({'label': scenario['label'], 'months': months,
+                                                'interest': total_interest, 'paid': total_paid}))
         else:
-            print(f"{scenario['label']:<20} {'Never':>6}   ${'∞':>10}        ${'∞':>10}")
+            lines.append(NEVER_PAID_ROW.format_map({'label': scenario['label']}))
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demo_rewards_analysis():
     """Demonstrate rewards and benefits analysis"""
-    print(f"\n" + "="*70)
-    print("🎁 REWARDS & BENEFITS ANALYSIS") 
-    print("="*70)
+    lines = []
+    lines.append(f"\n" + "="*70)
+    lines.append("🎁 REWARDS & BENEFITS ANALYSIS") 
+    lines.append("="*70)
     
     statement = sample_statement_september
     total_points = statement['total_rewards']
     monthly_points = statement['rewards_earned']
     
-    print(f"\n🏆 Rewards Status:")
-    print(f"   Points Earned This Month: {monthly_points:,}")
-    print(f"   Total Points Available: {total_points:,}")
-    
-    # Redemption options
-    redemptions = [
-        {"option": "Travel Reward (Domestic)", "points": 25000, "value": "$300"},
-        {"option": "Travel Reward (International)", "points": 50000, "value": "$600"},
-        {"option": "Cash Back", "points": 2500, "value": "$25"},
-        {"option": "Gift Cards", "points": 2000, "value": "$25"},
-    ]
-    
-    print(f"\n🎯 Available Redemptions:")
-    for redemption in redemptions:
-        points_needed = redemption['points']
-        if total_points >= points_needed:
-            available = total_points // points_needed
-            print(f"   ✅ {redemption['option']}: {available}x available ({redemption['value']} each)")
+    lines.append(f"\n🏆 Rewards Status:")
+    lines.append(f"   Points Earned This Month: {monthly_points:,}")
+    lines.append(f"   Total Points Available: {total_points:,}")
+    
+    # Redemption options, one column per field
+    redemptions = np.array([
+        ("Travel Reward (Domestic)", 25000, "$300"),
+        ("Travel Reward (International)", 50000, "$600"),
+        ("Cash Back", 2500, "$25"),
+        ("Gift Cards", 2000, "$25"),
+    ], dtype=[('option', 'U40'), ('points', 'i8'), ('value', 'U10')])
+    
+    # Availability and shortfall for every option at once
+    available = total_points // redemptions['points']
+    needed = np.maximum(redemptions['points'] - total_points, 0)
+    months_needed = needed / monthly_points if monthly_points > 0 else np.full(len(redemptions), np.inf)
+    
+    lines.append(f"\n🎯 Available Redemptions:")
+    for option, value, n_available, n_needed, months in zip(
+            redemptions['option'].tolist(), redemptions['value'].tolist(),
+            available.tolist(), needed.tolist(), months_needed.tolist()):
+        if n_needed == 0:
+            lines.append(f"   ✅ {option}: {n_available}x available ({value} each)")
+        elif months < 12:
+            lines.append(f"   ⏳ {option}: {n_needed:,} more points needed (~{months:.0f} months)")
         else:
-            needed = points_needed - total_points
-            months_needed = needed / monthly_points if monthly_points > 0 else float('inf')
-            if months_needed < 12:
-                print(f"   ⏳ {redemption['option']}: {needed:,} more points needed (~{months_needed:.0f} months)")
-            else:
-                print(f"   ❌ {redemption['option']}: {needed:,} more points needed")
+            lines.append(f"   ❌ {option}: {n_needed:,} more points needed")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     """Run the complete personal finance assistant demo"""
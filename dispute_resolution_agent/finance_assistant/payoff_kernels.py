@@ -0,0 +1,77 @@
+"""
+Closed-form debt payoff math, shared by the assistant and the demos
+"""
+
+import math
+from typing import Tuple
+import numpy as np
+
+# Payoffs longer than 100 years are reported as never
+MAX_PAYOFF_MONTHS = 1200
+
+
+def payoff_months(balance: float, payment: float, apr: float) -> float:
+    """
+    Months to pay off a balance at a fixed payment
+
+    Returns inf if the payment doesn't cover the monthly interest
+    """
+    monthly_rate = apr / 12
+    if payment <= balance * monthly_rate:
+        return float('inf')
+    if balance <= 0:
+        return 0.0
+    if monthly_rate == 0:
+        return float(math.ceil(balance / payment))
+    # Closed form of the amortization: N = -log(1 - r*B/P) / log(1 + r)
+    return float(math.ceil(-math.log1p(-monthly_rate * balance / payment) / math.log1p(monthly_rate)))
+
+
+def total_interest(balances, payments, apr: float, months) -> np.ndarray:
+    """
+    Total interest paid over a period, stopping early once the balance is
+    paid off; broadcast over arrays of balances, payments and periods
+    """
+    balances, payments, months = np.broadcast_arrays(
+        np.asarray(balances, dtype=np.float64),
+        np.asarray(payments, dtype=np.float64),
+        np.asarray(months, dtype=np.float64)
+    )
+    monthly_rate = apr / 12
+    if monthly_rate == 0:
+        return np.zeros(balances.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Stop at the payoff month, N = ceil(-log(1 - r*B/P) / log(1 + r))
+        covers_interest = payments > balances * monthly_rate
+        payoff_periods = np.where(
+            covers_interest,
+            np.ceil(-np.log1p(-monthly_rate * balances / payments) / np.log1p(monthly_rate)),
+            np.inf
+        )
+        periods = np.minimum(months, np.maximum(payoff_periods, 1))
+        # Balance after n months is B(1+r)^n - P((1+r)^n - 1)/r; interest is
+        # whatever the payments covered beyond the principal paid down
+        growth = (1 + monthly_rate) ** periods
+        end_balance = balances * growth - payments * (growth - 1) / monthly_rate
+        interest = end_balance - balances + payments * periods
+    return np.where(months > 0, interest, 0.0)
+
+
+def payoff(balance: float, payment: float, apr: float) -> Tuple[float, float]:
+    """
+    Payoff time and interest for a balance at a fixed payment
+
+    Args:
+        balance: Starting balance
+        payment: Fixed monthly payment
+        apr: Annual percentage rate (e.g. 0.1899)
+
+    Returns:
+        (months to pay off, total interest paid); both are inf if the
+        payment never clears the balance
+    """
+    months = payoff_months(balance, payment, apr)
+    if months > MAX_PAYOFF_MONTHS:
+        return float('inf'), float('inf')
+    return months, float(total_interest(balance, payment, apr, months))
@@ -3,12 +3,128 @@ Personal Finance Assistant using AWS Bedrock
 Reads monthly statements, explains in plain English, and provides personalized nudges
 """
 
+import os
 import json
+import hashlib
 import datetime
-from typing import Dict, List, Any, Optional
+import functools
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ParamValidationError
 import numpy as np
 
+from finance_assistant.payoff_kernels import payoff_months, total_interest
+
+try:
+    import orjson  # Optional: faster encoding/decoding of Bedrock request and response bodies
+    json_dumps, json_loads = orjson.dumps, orjson.loads
+except ImportError:
+    json_dumps, json_loads = json.dumps, json.loads
+
+# Warnings go through logging so callers running the assistant from several
+# threads (e.g. the buffered demo sections) don't get them mixed into output
+logger = logging.getLogger(__name__)
+
+# Doc embeddings are persisted here between runs
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "questcode")
+
+# Prompt for explain_statement, filled with format_map from the statement
+# fields (defaults below) plus the retrieved doc context
+STATEMENT_PROMPT = """
+        You are a helpful personal finance assistant. Explain this monthly statement in simple, plain English. 
+        Focus on what the customer needs to know and any important insights.
+
+        Financial Education Context:
+        {context}
+
+        Statement Details:
+        - Previous Balance: ${previous_balance:,.2f}
+        - New Charges: ${new_charges:,.2f}
+        - Payments: ${payments:,.2f}
+        - Current Balance: ${current_balance:,.2f}
+        - Minimum Payment: ${minimum_payment:,.2f}
+        - Due Date: {due_date}
+        - Interest Charged: ${interest_charged:,.2f}
+        - Available Credit: ${available_credit:,.2f}
+        - Spending Categories: {spending_categories}
+
+        Provide a clear, conversational explanation of what happened this month and what it means for the customer.
+
+        Statement Explanation:"""
+STATEMENT_QUERY = "credit card statement balance interest charges spending categories"
+STATEMENT_PROMPT_DEFAULTS = {
+    'previous_balance': 0,
+    'new_charges': 0,
+    'payments': 0,
+    'current_balance': 0,
+    'minimum_payment': 0,
+    'due_date': 'Not specified',
+    'interest_charged': 0,
+    'available_credit': 0,
+    'spending_categories': {}
+}
+
+# Pool sized for the concurrent doc-embedding fan-out and the parallel demo
+# sections, which all share one client per region
+BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'max_attempts': 2}
+)
+
+# One Bedrock runtime client per region, shared across assistants
+_CLIENTS: Dict[str, Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _bedrock_client(aws_region: str):
+    """Return the shared Bedrock runtime client for a region, creating it once"""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(aws_region)
+        if client is None:
+            client = _CLIENTS[aws_region] = boto3.client(
+                service_name='bedrock-runtime',
+                region_name=aws_region,
+                config=BEDROCK_CLIENT_CONFIG
+            )
+        return client
+
+DEFAULT_CLAUDE_MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+
+# Claude models Bedrock serves with latency-optimized inference; others
+# (e.g. claude-3-sonnet) reject performanceConfigLatency outright
+LATENCY_OPTIMIZED_MODEL_IDS = frozenset({
+    "anthropic.claude-3-5-haiku-20241022-v1:0",
+    "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+})
+
+# Models whose latency-optimized request was rejected anyway (region or
+# botocore without support), so later assistants skip the failing call
+_LATENCY_REJECTED_MODEL_IDS = set()
+
+@dataclass(slots=True, kw_only=True)
+class ScenarioResult:
+    """Outcome of one simulated scenario; fields that don't apply stay None"""
+    name: str
+    monthly_change: float
+    total_impact: Optional[float] = None
+    new_balance: float
+    additional_interest: Optional[float] = None
+    interest_saved: Optional[float] = None
+    summary: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form used by simulate_spending_changes, omitting name and unset fields"""
+        return {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name != 'name' and getattr(self, f.name) is not None
+        }
+
 class PersonalFinanceAssistant:
     """
     AI-powered personal finance assistant that:
@@ -18,21 +134,22 @@ class PersonalFinanceAssistant:
     - Uses RAG with financial documents
     """
     
-    def __init__(self, aws_region: str = "us-east-1"):
+    # Query embeddings memoized across instances, keyed on model id + text
+    EMBEDDING_CACHE_SIZE = 1024
+    _embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+    _embedding_cache_lock = threading.Lock()
+    
+    def __init__(self, aws_region: str = "us-east-1", claude_model_id: str = DEFAULT_CLAUDE_MODEL_ID):
         self.aws_region = aws_region
         
-        # Initialize Bedrock client
-        try:
-            self.bedrock_runtime = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=aws_region
-            )
-        except Exception as e:
-            print(f"Warning: Could not initialize Bedrock client: {e}")
-            self.bedrock_runtime = None
+        # The Bedrock client and doc embeddings are built on first use, so
+        # callers that never touch Bedrock or RAG don't pay for them
+        self._doc_store_value = None
+        self._doc_store_lock = threading.Lock()
+        self._statement_context_value: Optional[str] = None
         
         # Model configurations
-        self.claude_model_id = "anthropic.claude-3-sonnet-20240229-v1:0"
+        self.claude_model_id = claude_model_id
         self.titan_embed_model_id = "amazon.titan-embed-text-v1"
         
         # Financial knowledge base (in production, load from external source)
@@ -58,80 +175,176 @@ class PersonalFinanceAssistant:
                 "content": "Aim for 3-6 months of expenses in an emergency fund. Keep this in a high-yield savings account for easy access. Start with $1,000 if you're building from zero, then gradually increase to the full amount."
             }
         ]
-        
-        # Precompute embeddings for RAG
-        self.doc_embeddings = self._precompute_embeddings()
     
-    def _precompute_embeddings(self) -> List[Dict[str, Any]]:
+    @functools.cached_property
+    def bedrock_runtime(self):
+        """Bedrock runtime client, shared by every assistant in the same region"""
+        try:
+            return _bedrock_client(self.aws_region)
+        except Exception as e:
+            logger.warning("Could not initialize Bedrock client: %s", e)
+            return None
+    
+    @property
+    def _doc_store(self) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray]]:
+        """(doc metadata, doc matrix) for RAG, embedded on first retrieval"""
+        if self._doc_store_value is None:
+            with self._doc_store_lock:
+                if self._doc_store_value is None:
+                    cached = self._load_doc_matrix()
+                    if cached is not None:
+                        self._doc_store_value = (self.financial_docs, cached)
+                    else:
+                        self._doc_store_value = self._build_doc_matrix(self._precompute_embeddings())
+        return self._doc_store_value
+    
+    @property
+    def _statement_context(self) -> str:
+        """
+        Doc context for explain_statement; its query and the docs are fixed, so
+        it is kept once a retrieval succeeds (the fallback is never cached)
+        """
+        if self._statement_context_value is None:
+            query_embedding = self._get_embedding(STATEMENT_QUERY)
+            relevant_docs = self._retrieve_relevant_docs(STATEMENT_QUERY, top_k=2, query_embedding=query_embedding)
+            context = "\n\n".join([f"{doc['title']}: {doc['content']}" for doc in relevant_docs])
+            if query_embedding is None:
+                return context
+            self._statement_context_value = context
+        return self._statement_context_value
+    
+    def _load_doc_matrix(self) -> Optional[np.ndarray]:
+        """
+        Memory-map the doc matrix saved by an earlier run, if there is one for
+        these docs; its rows are already unit-length float32
+        """
+        cache_path = self._doc_matrix_cache_path()
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            matrix = np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load cached embeddings from %s: %s", cache_path, e)
+            return None
+        if matrix.dtype != np.float32 or matrix.ndim != 2 or matrix.shape[0] != len(self.financial_docs):
+            logger.warning("Ignoring cached embeddings in %s: unexpected shape %s", cache_path, matrix.shape)
+            return None
+        return matrix
+    
+    def _precompute_embeddings(self) -> List[Optional[np.ndarray]]:
         """Precompute embeddings for financial documents"""
-        embeddings = []
-        for doc in self.financial_docs:
+        if not self.financial_docs:
+            return []
+        # Titan embeds one text per call, so fan the docs out over threads;
+        # map() keeps the results in document order
+        with ThreadPoolExecutor(max_workers=min(8, len(self.financial_docs))) as executor:
+            return list(executor.map(self._embed_doc, self.financial_docs))
+    
+    def _embed_doc(self, doc: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Embed one financial document, or None if it fails"""
+        try:
+            return self._get_embedding(doc['content'])
+        except Exception as e:
+            logger.warning("Could not embed document %s: %s", doc['id'], e)
+            return None
+    
+    def _build_doc_matrix(self, vectors: List[Optional[np.ndarray]]) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Lay the embedded docs out column-wise: a parallel list of doc metadata
+        plus one contiguous (N, D) float32 matrix of unit-length rows
+        """
+        embedded = [(doc, vector) for doc, vector in zip(self.financial_docs, vectors) if vector is not None]
+        doc_meta = [doc for doc, _ in embedded]
+        if not embedded:
+            return doc_meta, None
+        
+        matrix = np.vstack([vector for _, vector in embedded]).astype(np.float32, copy=False)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # Normalized once here, so a lookup's dot product is already the cosine
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms != 0)
+        
+        # Persist only a complete set, so a partial failure is retried next run
+        if len(embedded) == len(self.financial_docs):
+            cache_path = self._doc_matrix_cache_path()
             try:
-                embedding = self._get_embedding(doc['content'])
-                embeddings.append({
-                    'id': doc['id'],
-                    'title': doc['title'],
-                    'content': doc['content'],
-                    'embedding': embedding
-                })
-            except Exception as e:
-                print(f"Warning: Could not embed document {doc['id']}: {e}")
-                embeddings.append({
-                    'id': doc['id'],
-                    'title': doc['title'],
-                    'content': doc['content'],
-                    'embedding': None
-                })
-        return embeddings
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                np.save(cache_path, matrix)
+            except OSError as e:
+                logger.warning("Could not cache embeddings to %s: %s", cache_path, e)
+        return doc_meta, matrix
+    
+    def _doc_matrix_cache_path(self) -> str:
+        """Cache file for the normalized doc matrix, keyed on the embedding model and document contents"""
+        # Hash a JSON list so document boundaries are part of the key
+        key = json.dumps([self.titan_embed_model_id, [doc['content'] for doc in self.financial_docs]])
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(CACHE_DIR, f"doc-matrix-{digest[:16]}.npy")
     
     def _get_embedding(self, text: str) -> Optional[np.ndarray]:
         """Get embedding vector for text using Bedrock Titan"""
         if not self.bedrock_runtime:
             return None
+        
+        key = hashlib.sha256(f"{self.titan_embed_model_id}\0{text}".encode()).digest()
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                self._embedding_cache.move_to_end(key)
+                return cached
             
         try:
-            body = json.dumps({"inputText": text})
+            body = json_dumps({"inputText": text})
             response = self.bedrock_runtime.invoke_model(
                 modelId=self.titan_embed_model_id,
                 contentType="application/json",
                 body=body
             )
             
-            response_body = json.loads(response['body'].read())
-            embedding = np.array(response_body['embedding'])
+            response_body = json_loads(response['body'].read())
+            # float32 halves memory and bandwidth; unit length makes dot products cosines
+            embedding = np.asarray(response_body['embedding'], dtype=np.float32)
+            norm = np.linalg.norm(embedding)
+            if norm > 0:
+                embedding /= norm
+            # Read-only, since the same array is handed to every caller
+            embedding.flags.writeable = False
+            
+            with self._embedding_cache_lock:
+                self._embedding_cache[key] = embedding
+                self._embedding_cache.move_to_end(key)
+                if len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
             return embedding
         except Exception as e:
-            print(f"Error getting embedding: {e}")
+            logger.error("Error getting embedding: %s", e)
             return None
     
-    def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        """Calculate cosine similarity between vectors"""
-        if a is None or b is None:
-            return 0.0
-        
-        dot_product = np.dot(a, b)
-        norm_a = np.linalg.norm(a)
-        norm_b = np.linalg.norm(b)
-        
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-            
-        return dot_product / (norm_a * norm_b)
-    
-    def _retrieve_relevant_docs(self, query: str, top_k: int = 2) -> List[Dict[str, Any]]:
+    def _retrieve_relevant_docs(self, query: str, top_k: int = 2,
+                                query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """Retrieve relevant financial documents using semantic search"""
-        query_embedding = self._get_embedding(query)
         if query_embedding is None:
-            return self.doc_embeddings[:top_k]  # Fallback
-        
-        similarities = []
-        for doc_data in self.doc_embeddings:
-            if doc_data['embedding'] is not None:
-                similarity = self._cosine_similarity(query_embedding, doc_data['embedding'])
-                similarities.append((similarity, doc_data))
-        
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        return [doc_data for _, doc_data in similarities[:top_k]]
+            query_embedding = self._get_embedding(query)
+        if query_embedding is None:
+            return self.financial_docs[:top_k]  # Fallback
+        
+        doc_meta, doc_matrix = self._doc_store
+        if doc_matrix is None or top_k <= 0:
+            return []
+        
+        # Normalize the query once; scores are then one matrix-vector product
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            scores = np.zeros(len(doc_meta), dtype=np.float32)
+        else:
+            scores = doc_matrix @ (query / query_norm)
+        
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+            order = candidates[np.argsort(-scores[candidates], kind='stable')]
+        else:
+            order = np.argsort(-scores, kind='stable')
+        return [doc_meta[i] for i in order.tolist()]
     
     def _invoke_claude(self, prompt: str, max_tokens: int = 1000) -> str:
         """Invoke Claude model on Bedrock"""
@@ -139,7 +352,7 @@ class PersonalFinanceAssistant:
             return "Bedrock client not available - using fallback response"
         
         try:
-            body = json.dumps({
+            body = json_dumps({
                 "anthropic_version": "bedrock-2023-05-31",
                 "max_tokens": max_tokens,
                 "messages": [
@@ -150,16 +363,30 @@ class PersonalFinanceAssistant:
                 ]
             })
             
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.claude_model_id,
-                contentType="application/json",
-                body=body
-            )
+            request = {
+                "modelId": self.claude_model_id,
+                "contentType": "application/json",
+                "body": body
+            }
+            if (self.claude_model_id in LATENCY_OPTIMIZED_MODEL_IDS
+                    and self.claude_model_id not in _LATENCY_REJECTED_MODEL_IDS):
+                try:
+                    response = self.bedrock_runtime.invoke_model(performanceConfigLatency="optimized", **request)
+                except (ClientError, ParamValidationError) as e:
+                    if isinstance(e, ClientError) and e.response['Error']['Code'] != 'ValidationException':
+                        raise
+                    # Region (or an older botocore) without latency-optimized
+                    # inference: fall back to standard mode for this model from now on
+                    logger.warning("Latency-optimized inference unavailable, using standard: %s", e)
+                    _LATENCY_REJECTED_MODEL_IDS.add(self.claude_model_id)
+                    response = self.bedrock_runtime.invoke_model(**request)
+            else:
+                response = self.bedrock_runtime.invoke_model(**request)
             
-            response_body = json.loads(response['body'].read())
+            response_body = json_loads(response['body'].read())
             return response_body['content'][0]['text']
         except Exception as e:
-            print(f"Error invoking Claude: {e}")
+            logger.error("Error invoking Claude: %s", e)
             return f"Error generating response: {str(e)}"
     
     def explain_statement(self, statement_data: Dict[str, Any]) -> str:
@@ -172,37 +399,13 @@ class PersonalFinanceAssistant:
         Returns:
             Plain English explanation of the statement
         """
-        # Retrieve relevant financial docs
-        query = f"credit card statement balance interest charges spending categories"
-        relevant_docs = self._retrieve_relevant_docs(query, top_k=2)
-        context = "\n\n".join([f"{doc['title']}: {doc['content']}" for doc in relevant_docs])
-        
-        prompt = f"""
-        You are a helpful personal finance assistant. Explain this monthly statement in simple, plain English. 
-        Focus on what the customer needs to know and any important insights.
-
-        Financial Education Context:
-        {context}
-
-        Statement Details:
-        - Previous Balance: ${statement_data.get('previous_balance', 0):,.2f}
-        - New Charges: ${statement_data.get('new_charges', 0):,.2f}
-        - Payments: ${statement_data.get('payments', 0):,.2f}
-        - Current Balance: ${statement_data.get('current_balance', 0):,.2f}
-        - Minimum Payment: ${statement_data.get('minimum_payment', 0):,.2f}
-        - Due Date: {statement_data.get('due_date', 'Not specified')}
-        - Interest Charged: ${statement_data.get('interest_charged', 0):,.2f}
-        - Available Credit: ${statement_data.get('available_credit', 0):,.2f}
-        - Spending Categories: {statement_data.get('spending_categories', {})}
-
-        Provide a clear, conversational explanation of what happened this month and what it means for the customer.
-
-        Statement Explanation:"""
-        
         if not self.bedrock_runtime:
             # Fallback explanation without AI
             return self._fallback_statement_explanation(statement_data)
         
+        prompt_fields = {**STATEMENT_PROMPT_DEFAULTS, **statement_data, 'context': self._statement_context}
+        prompt = STATEMENT_PROMPT.format_map(prompt_fields)
+        
         return self._invoke_claude(prompt, max_tokens=600)
     
     def _fallback_statement_explanation(self, statement_data: Dict[str, Any]) -> str:
@@ -271,7 +474,10 @@ This month's statement breakdown:
         # Spending category insights
         spending_categories = statement_data.get('spending_categories', {})
         if spending_categories:
-            highest_category = max(spending_categories.items(), key=lambda x: x[1])
+            labels = list(spending_categories)
+            amounts = np.fromiter(spending_categories.values(), dtype=np.float64, count=len(labels))
+            top = int(amounts.argmax())
+            highest_category = (labels[top], float(amounts[top]))
             if highest_category[1] > new_charges * 0.3:  # If one category is >30% of spending
                 nudges.append(f"🛍️ {highest_category[0]} was your biggest expense at ${highest_category[1]:,.2f}. Consider setting a budget for this category.")
         
@@ -288,12 +494,7 @@ This month's statement breakdown:
     
     def _calculate_payoff_time(self, balance: float, monthly_payment: float, annual_rate: float) -> float:
         """Calculate months to pay off balance"""
-        if monthly_payment <= balance * (annual_rate / 12):
-            return float('inf')  # Payment doesn't cover interest
-        
-        monthly_rate = annual_rate / 12
-        months = -np.log(1 - (balance * monthly_rate) / monthly_payment) / np.log(1 + monthly_rate)
-        return months
+        return payoff_months(balance, monthly_payment, annual_rate)
     
     def simulate_spending_changes(self, current_statement: Dict[str, Any], scenarios: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -306,73 +507,63 @@ This month's statement breakdown:
         Returns:
             Analysis of each scenario's impact
         """
-        results = {}
-        
-        for scenario in scenarios:
+        return {result.name: result.to_dict() for result in self.simulate_scenarios(current_statement, scenarios)}
+    
+    def simulate_scenarios(self, current_statement: Dict[str, Any], scenarios: List[Dict[str, Any]]) -> List[ScenarioResult]:
+        """Same analysis as simulate_spending_changes, as a list of ScenarioResult records"""
+        current_balance = current_statement.get('current_balance', 0)
+        current_payment = current_statement.get('minimum_payment', 0)
+        interest_rate = current_statement.get('interest_rate', 0.1899)
+        minimum_payment = current_balance * 0.02  # Assume 2% minimum when comparing savings
+        
+        # Scenario parameters as arrays, so every outcome is one broadcast expression
+        changes = np.array([s.get('monthly_change', 0) for s in scenarios], dtype=np.float64)  # Positive = spend more, Negative = save more
+        durations = np.array([s.get('duration_months', 12) for s in scenarios], dtype=np.float64)
+        spending_balances = current_balance + changes * durations
+        spending_interest = self._batch_total_interest(spending_balances, current_payment, interest_rate, durations)
+        interest_saved = np.maximum(
+            self._batch_total_interest(current_balance, minimum_payment, interest_rate, durations)
+            - self._batch_total_interest(current_balance, minimum_payment + np.abs(changes), interest_rate, durations),
+            0.0
+        )
+        
+        results = []
+        for i, scenario in enumerate(scenarios):
             scenario_name = scenario.get('name', 'Unnamed Scenario')
-            monthly_change = scenario.get('monthly_change', 0)  # Positive = spend more, Negative = save more
+            monthly_change = scenario.get('monthly_change', 0)
             duration_months = scenario.get('duration_months', 12)
             
-            # Calculate impact
-            current_balance = current_statement.get('current_balance', 0)
-            current_payment = current_statement.get('minimum_payment', 0)
-            interest_rate = current_statement.get('interest_rate', 0.1899)
-            
             # Scenario 1: Additional spending (increases balance)
             if monthly_change > 0:
-                new_balance = current_balance + (monthly_change * duration_months)
-                new_interest_cost = self._calculate_total_interest(new_balance, current_payment, interest_rate, duration_months)
+                new_interest_cost = float(spending_interest[i])
+                results.append(ScenarioResult(
+                    name=scenario_name,
+                    monthly_change=monthly_change,
+                    new_balance=float(spending_balances[i]),
+                    additional_interest=new_interest_cost,
+                    summary=f"Spending ${monthly_change:,.2f} more per month would add ${monthly_change * duration_months:,.2f} to debt and ~${new_interest_cost:,.2f} in extra interest"
+                ))
             # Scenario 2: Additional savings (reduces spending/increases payments)
             else:
-                additional_payment = abs(monthly_change)
-                total_saved = additional_payment * duration_months
-                new_balance = max(0, current_balance - total_saved)
-                interest_saved = self._calculate_interest_saved(current_balance, additional_payment, interest_rate, duration_months)
-                
-                results[scenario_name] = {
-                    'monthly_change': monthly_change,
-                    'total_impact': total_saved,
-                    'new_balance': new_balance,
-                    'interest_saved': interest_saved,
-                    'summary': f"Saving ${abs(monthly_change):,.2f}/month for {duration_months} months would save ${total_saved:,.2f} total and ${interest_saved:,.2f} in interest"
-                }
-                continue
-            
-            results[scenario_name] = {
-                'monthly_change': monthly_change,
-                'new_balance': new_balance,
-                'additional_interest': new_interest_cost,
-                'summary': f"Spending ${monthly_change:,.2f} more per month would add ${monthly_change * duration_months:,.2f} to debt and ~${new_interest_cost:,.2f} in extra interest"
-            }
+                total_saved = abs(monthly_change) * duration_months
+                results.append(ScenarioResult(
+                    name=scenario_name,
+                    monthly_change=monthly_change,
+                    total_impact=total_saved,
+                    new_balance=max(0, current_balance - total_saved),
+                    interest_saved=float(interest_saved[i]),
+                    summary=f"Saving ${abs(monthly_change):,.2f}/month for {duration_months} months would save ${total_saved:,.2f} total and ${interest_saved[i]:,.2f} in interest"
+                ))
         
         return results
     
     def _calculate_total_interest(self, balance: float, payment: float, annual_rate: float, months: int) -> float:
-        """Calculate total interest over a period"""
-        monthly_rate = annual_rate / 12
-        total_interest = 0
-        current_balance = balance
-        
-        for _ in range(months):
-            interest_charge = current_balance * monthly_rate
-            total_interest += interest_charge
-            current_balance = current_balance + interest_charge - payment
-            if current_balance <= 0:
-                break
-                
-        return total_interest
+        """Calculate total interest over a period, stopping early once the balance is paid off"""
+        return float(self._batch_total_interest(balance, payment, annual_rate, months))
     
-    def _calculate_interest_saved(self, balance: float, extra_payment: float, annual_rate: float, months: int) -> float:
-        """Calculate interest saved by making extra payments"""
-        # Interest with minimum payments
-        minimum_payment = balance * 0.02  # Assume 2% minimum
-        interest_normal = self._calculate_total_interest(balance, minimum_payment, annual_rate, months)
-        
-        # Interest with extra payments
-        enhanced_payment = minimum_payment + extra_payment
-        interest_with_extra = self._calculate_total_interest(balance, enhanced_payment, annual_rate, months)
-        
-        return max(0, interest_normal - interest_with_extra)
+    def _batch_total_interest(self, balances, payments, annual_rate: float, months) -> np.ndarray:
+        """Closed-form total interest, broadcast over arrays of balances, payments and periods"""
+        return total_interest(balances, payments, annual_rate, months)
     
     def generate_financial_report(self, statement_data: Dict[str, Any], user_goals: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -385,20 +576,24 @@ This month's statement breakdown:
         Returns:
             Complete financial analysis report
         """
-        # Get statement explanation
-        explanation = self.explain_statement(statement_data)
-        
-        # Generate personalized nudges
-        nudges = self.generate_nudges(statement_data, user_goals)
-        
-        # Run common scenarios
-        scenarios = [
-            {"name": "Save $200 more per month", "monthly_change": -200, "duration_months": 12},
-            {"name": "Save $100 more per month", "monthly_change": -100, "duration_months": 12},
-            {"name": "Spend $150 more per month", "monthly_change": 150, "duration_months": 12}
-        ]
-        
-        scenario_analysis = self.simulate_spending_changes(statement_data, scenarios)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Get statement explanation; the Claude call runs in the background
+            # while the local nudges and scenarios are computed here
+            explanation_future = executor.submit(self.explain_statement, statement_data)
+            
+            # Generate personalized nudges
+            nudges = self.generate_nudges(statement_data, user_goals)
+            
+            # Run common scenarios
+            scenarios = [
+                {"name": "Save $200 more per month", "monthly_change": -200, "duration_months": 12},
+                {"name": "Save $100 more per month", "monthly_change": -100, "duration_months": 12},
+                {"name": "Spend $150 more per month", "monthly_change": 150, "duration_months": 12}
+            ]
+            
+            scenario_analysis = self.simulate_spending_changes(statement_data, scenarios)
+            
+            explanation = explanation_future.result()
         
         return {
             "statement_explanation": explanation,
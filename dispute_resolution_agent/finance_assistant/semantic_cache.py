@@ -0,0 +1,65 @@
+"""
+Semantic cache for the Personal Finance Assistant
+Serves cached results for questions whose embeddings are near-duplicates
+"""
+
+from typing import Any, List, Optional
+import numpy as np
+
+class SemanticCache:
+    """
+    Embedding-keyed cache: a lookup hits when the cosine similarity between
+    the query embedding and a stored key reaches the threshold.
+
+    Keys are stored L2-normalized in one (N, dim) matrix, so a lookup is a
+    single matrix-vector product.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.keys: Optional[np.ndarray] = None
+        self.values: List[Any] = []
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def get(self, embedding: Optional[np.ndarray], threshold: Optional[float] = None) -> Optional[Any]:
+        """Return the value cached under the most similar key, or None on a miss"""
+        if embedding is None or self.keys is None:
+            return None
+
+        query = self._normalize(embedding)
+        if query is None or query.shape[0] != self.keys.shape[1]:
+            return None
+
+        scores = self.keys @ query
+        best = int(np.argmax(scores))
+        if scores[best] >= (self.threshold if threshold is None else threshold):
+            return self.values[best]
+        return None
+
+    def set(self, embedding: Optional[np.ndarray], value: Any) -> None:
+        """Cache a value under an embedding; the oldest entry is evicted when full"""
+        if embedding is None:
+            return
+
+        key = self._normalize(embedding)
+        if key is None:
+            return
+
+        if self.keys is None:
+            self.keys = key[None, :]
+        else:
+            self.keys = np.vstack([self.keys, key])
+        self.values.append(value)
+
+        if len(self.values) > self.max_entries:
+            self.keys = self.keys[1:]
+            self.values.pop(0)
+
+    def __len__(self) -> int:
+        return len(self.values)
@@ -4,9 +4,119 @@ Extracts and standardizes data from various statement formats
 """
 
 import re
+import io
+import csv
 import json
+import hashlib
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+
+from finance_assistant.csv_kernels import NUMBA_AVAILABLE, parse_amount_column
+
+# Patterns used on every statement line, compiled once at import
+_AMOUNT_RE = re.compile(r'\$?(\d[\d,]*(?:\.\d+)?)')
+_DATE_RES = (
+    re.compile(r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})'),
+    re.compile(r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2})'),
+    re.compile(r'(\w{3,9}\s+\d{1,2},?\s+\d{4})')  # Month Day, Year
+)
+
+# Common patterns for extracting financial data; re.search/findall accept
+# these compiled objects wherever the raw strings were used
+_PATTERNS = {
+    'balance': re.compile(r'(?:balance|amount due|total)[:\s]*\$?(\d[\d,]*(?:\.\d+)?)'),
+    'payment': re.compile(r'(?:payment|paid)[:\s]*\$?(\d[\d,]*(?:\.\d+)?)'),
+    'interest': re.compile(r'(?:interest|finance charge)[:\s]*\$?(\d[\d,]*(?:\.\d+)?)'),
+    'date': re.compile(r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'),
+    'amount': re.compile(r'\$?([\d,]+\.\d{2})'),
+    'category': re.compile(r'(dining|restaurant|gas|grocery|travel|shopping|retail)'),
+}
+
+# Every statement-line keyword, found in one scan per line. The lookahead
+# lets matches overlap; at a shared start the longer keyword is listed first
+# and _IMPLIED_KEYWORDS adds back the shorter one it contains
+_LINE_KEYWORDS = re.compile(
+    r'(?=(previous balance|last balance|current balance|new balance|minimum payment|minimum'
+    r'|payment due|payment|interest|finance charge|due date|credit limit|available credit))'
+)
+_IMPLIED_KEYWORDS = {
+    'minimum payment': ('minimum', 'payment'),
+    'payment due': ('payment',),
+}
+
+# (statement field, keywords that select it, keywords that rule it out),
+# in priority order: a line sets the first field it qualifies for
+_LINE_RULES = (
+    ('previous_balance', frozenset({'previous balance', 'last balance'}), frozenset()),
+    ('current_balance', frozenset({'current balance', 'new balance'}), frozenset()),
+    ('payments', frozenset({'payment'}), frozenset({'minimum'})),
+    ('minimum_payment', frozenset({'minimum payment'}), frozenset()),
+    ('interest_charged', frozenset({'interest', 'finance charge'}), frozenset()),
+    ('due_date', frozenset({'due date', 'payment due'}), frozenset()),
+    ('credit_limit', frozenset({'credit limit'}), frozenset()),
+    ('available_credit', frozenset({'available credit'}), frozenset()),
+)
+
+def _classify_line(line: str) -> Optional[str]:
+    """Return the statement field a (lowercased) line describes, if any"""
+    found = set()
+    for match in _LINE_KEYWORDS.finditer(line):
+        keyword = match.group(1)
+        found.add(keyword)
+        found.update(_IMPLIED_KEYWORDS.get(keyword, ()))
+    if not found:
+        return None
+    
+    for field, keywords, excluded in _LINE_RULES:
+        if not found.isdisjoint(keywords) and found.isdisjoint(excluded):
+            return field
+    return None
+
+# Category keywords, checked in order
+CATEGORY_KEYWORDS = {
+    'Dining & Restaurants': ['restaurant', 'dining', 'food', 'cafe', 'pizza', 'burger', 'starbucks'],
+    'Gas & Auto': ['gas', 'shell', 'chevron', 'exxon', 'bp', 'auto', 'car'],
+    'Groceries': ['grocery', 'supermarket', 'whole foods', 'safeway', 'kroger', 'walmart'],
+    'Shopping & Retail': ['amazon', 'target', 'walmart', 'mall', 'store', 'retail', 'shopping'],
+    'Travel': ['airline', 'hotel', 'travel', 'uber', 'lyft', 'rental', 'airport'],
+    'Utilities': ['electric', 'gas company', 'water', 'internet', 'phone', 'cable'],
+    'Entertainment': ['movie', 'theater', 'netflix', 'spotify', 'game', 'entertainment'],
+    'Healthcare': ['medical', 'doctor', 'pharmacy', 'hospital', 'health'],
+    'Other': []
+}
+
+# Every category keyword in one pattern, one capturing group per category.
+# The lookahead reports the first matching category at each position, so the
+# lowest group index seen over a scan is the first category in priority order
+_CATEGORY_NAMES = tuple(cat_name for cat_name, keywords in CATEGORY_KEYWORDS.items() if keywords)
+_CATEGORY_RE = re.compile('(?=' + '|'.join(
+    '(' + '|'.join(re.escape(keyword) for keyword in CATEGORY_KEYWORDS[cat_name]) + ')'
+    for cat_name in _CATEGORY_NAMES
+) + ')')
+
+# Amount cleanup in one pass: drop '$', ',' and ')', and read '(' as a minus
+_AMOUNT_TRANS = str.maketrans({'$': None, ',': None, '(': '-', ')': None})
+
+# Common column names for each standard transaction field, in priority order
+FIELD_MAPPINGS = {
+    'date': ['date', 'transaction date', 'trans date'],
+    'merchant': ['merchant', 'description', 'vendor', 'payee'],
+    'amount': ['amount', 'debit', 'credit', 'transaction amount'],
+    'category': ['category', 'type', 'classification'],
+    'description': ['description', 'memo', 'details']
+}
+
+# Inverted once: column name -> ((standard field, priority), ...)
+_NAME_TO_FIELDS: Dict[str, Tuple[Tuple[str, int], ...]] = {}
+for _field, _names in FIELD_MAPPINGS.items():
+    for _priority, _name in enumerate(_names):
+        _NAME_TO_FIELDS[_name] = _NAME_TO_FIELDS.get(_name, ()) + ((_field, _priority),)
+del _field, _names, _priority, _name
+
+# CSV text size above which amount columns go through the compiled parser;
+# below it the JIT call overhead outweighs the per-row savings
+CSV_KERNEL_THRESHOLD = 1 << 20
 
 class StatementParser:
     """
@@ -18,15 +128,8 @@ class StatementParser:
     """
     
     def __init__(self):
-        # Common patterns for extracting financial data
-        self.patterns = {
-            'balance': r'(?:balance|amount due|total)[:\s]*\$?([\d,]+\.?\d*)',
-            'payment': r'(?:payment|paid)[:\s]*\$?([\d,]+\.?\d*)',
-            'interest': r'(?:interest|finance charge)[:\s]*\$?([\d,]+\.?\d*)',
-            'date': r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-            'amount': r'\$?([\d,]+\.\d{2})',
-            'category': r'(dining|restaurant|gas|grocery|travel|shopping|retail)',
-        }
+        # Common patterns for extracting financial data (shared, precompiled)
+        self.patterns = _PATTERNS
     
     def parse_statement_text(self, statement_text: str) -> Dict[str, Any]:
         """
@@ -39,62 +142,36 @@ class StatementParser:
             Structured statement data
         """
         statement_data = {
-            'raw_text': statement_text,
+            # A fingerprint instead of a copy of the (possibly large) input
+            'raw_text_digest': hashlib.blake2b(statement_text.encode(), digest_size=16).hexdigest(),
             'parsed_at': datetime.now().isoformat(),
             'parsing_method': 'text_extraction'
         }
         
-        # Extract key financial figures
-        lines = statement_text.lower().split('\n')
+        # Extract key financial figures. One keyword scan over the whole text
+        # finds the lines worth reading; all other lines are never sliced out
+        text = statement_text.lower()
+        line_end = -1
         
-        for line in lines:
-            # Previous balance
-            if 'previous balance' in line or 'last balance' in line:
-                amount = self._extract_amount(line)
-                if amount:
-                    statement_data['previous_balance'] = amount
-            
-            # Current balance
-            elif 'current balance' in line or 'new balance' in line:
-                amount = self._extract_amount(line)
-                if amount:
-                    statement_data['current_balance'] = amount
-            
-            # Payments
-            elif 'payment' in line and 'minimum' not in line:
-                amount = self._extract_amount(line)
-                if amount:
-                    statement_data['payments'] = amount
-            
-            # Minimum payment
-            elif 'minimum payment' in line:
-                amount = self._extract_amount(line)
-                if amount:
-                    statement_data['minimum_payment'] = amount
-            
-            # Interest charges
-            elif 'interest' in line or 'finance charge' in line:
-                amount = self._extract_amount(line)
-                if amount:
-                    statement_data['interest_charged'] = amount
+        for match in _LINE_KEYWORDS.finditer(text):
+            if match.start() < line_end:
+                continue  # Line already handled
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            line_end = text.find('\n', match.start())
+            if line_end == -1:
+                line_end = len(text)
             
-            # Due date
-            elif 'due date' in line or 'payment due' in line:
-                date = self._extract_date(line)
-                if date:
-                    statement_data['due_date'] = date
-            
-            # Credit limit
-            elif 'credit limit' in line:
-                amount = self._extract_amount(line)
-                if amount:
-                    statement_data['credit_limit'] = amount
+            line = text[line_start:line_end]
+            field = _classify_line(line)
+            if field is None:
+                continue
             
-            # Available credit
-            elif 'available credit' in line:
-                amount = self._extract_amount(line)
-                if amount:
-                    statement_data['available_credit'] = amount
+            if field == 'due_date':
+                value = self._extract_date(line)
+            else:
+                value = self._extract_amount(line)
+            if value:
+                statement_data[field] = value
         
         # Calculate missing fields
         statement_data = self._calculate_derived_fields(statement_data)
@@ -111,45 +188,72 @@ class StatementParser:
         Returns:
             List of transaction dictionaries
         """
+        return list(self._iter_csv_transactions(csv_text))
+    
+    def parse_and_categorize_csv(self, csv_text: str) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """
+        Parse a CSV export and total it by category in a single pass
+        
+        Args:
+            csv_text: CSV content as string
+            
+        Returns:
+            (list of transaction dictionaries, dictionary of category totals)
+        """
         transactions = []
-        lines = csv_text.strip().split('\n')
+        categories = defaultdict(float)
+        append, categorize = transactions.append, self._categorize_transaction
+        for transaction in self._iter_csv_transactions(csv_text):
+            append(transaction)
+            categories[categorize(transaction)] += abs(transaction.get('amount', 0))
+        return transactions, dict(categories)
+    
+    def _iter_csv_transactions(self, csv_text: str) -> Iterator[Dict[str, Any]]:
+        """Yield standardized transactions from CSV content"""
+        # The csv module handles quoted fields, including embedded commas
+        reader = csv.reader(io.StringIO(csv_text))
         
-        if not lines:
-            return transactions
+        # Assume first non-blank row is header
+        headers = next((row for row in reader if row), None)
+        if headers is None:
+            return
+        headers = [h.strip().lower() for h in headers]
         
-        # Assume first line is header
-        headers = [h.strip().lower() for h in lines[0].split(',')]
+        # Skip blank and malformed lines
+        rows = (
+            dict(zip(headers, (v.strip() for v in values)))
+            for values in reader
+            if len(values) == len(headers)
+        )
+        if NUMBA_AVAILABLE and len(csv_text) > CSV_KERNEL_THRESHOLD:
+            rows = self._preparse_amounts(list(rows), headers)
         
-        for line in lines[1:]:
-            if not line.strip():
-                continue
-                
-            values = [v.strip().strip('"') for v in line.split(',')]
-            
-            if len(values) != len(headers):
-                continue  # Skip malformed lines
-            
-            transaction = {}
-            for i, header in enumerate(headers):
-                if i < len(values):
-                    transaction[header] = values[i]
-            
+        for transaction in rows:
             # Standardize transaction format
             standardized = self._standardize_transaction(transaction)
             if standardized:
-                transactions.append(standardized)
-        
-        return transactions
+                yield standardized
+    
+    def _preparse_amounts(self, rows: List[Dict[str, Any]], headers: List[str]) -> List[Dict[str, Any]]:
+        """Replace amount-column strings with floats parsed in one compiled pass per column"""
+        for name in headers:
+            if name not in FIELD_MAPPINGS['amount']:
+                continue
+            amounts = parse_amount_column([row[name] for row in rows]).tolist()
+            for row, amount in zip(rows, amounts):
+                if amount == amount:  # NaN: leave it to the regular parse
+                    row[name] = amount
+        return rows
     
     def _extract_amount(self, text: str) -> Optional[float]:
         """Extract monetary amount from text"""
-        # Remove common non-numeric characters and find amount
-        amount_pattern = r'\$?([\d,]+\.?\d*)'
-        matches = re.findall(amount_pattern, text)
+        # Take the last/largest amount found, without collecting every match
+        last = None
+        for last in _AMOUNT_RE.finditer(text):
+            pass
         
-        if matches:
-            # Take the last/largest amount found
-            amount_str = matches[-1].replace(',', '')
+        if last:
+            amount_str = last.group(1).replace(',', '')
             try:
                 return float(amount_str)
             except ValueError:
@@ -158,14 +262,8 @@ class StatementParser:
     
     def _extract_date(self, text: str) -> Optional[str]:
         """Extract date from text"""
-        date_patterns = [
-            r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})',
-            r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2})',
-            r'(\w{3,9}\s+\d{1,2},?\s+\d{4})'  # Month Day, Year
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
+        for pattern in _DATE_RES:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
@@ -173,35 +271,27 @@ class StatementParser:
     
     def _standardize_transaction(self, transaction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Standardize transaction format"""
-        standard_fields = ['date', 'merchant', 'amount', 'category', 'description']
-        standardized = {}
+        # Best-priority cleaned value seen so far for each standard field
+        found = {}
         
-        # Map common field names
-        field_mappings = {
-            'date': ['date', 'transaction date', 'trans date'],
-            'merchant': ['merchant', 'description', 'vendor', 'payee'],
-            'amount': ['amount', 'debit', 'credit', 'transaction amount'],
-            'category': ['category', 'type', 'classification'],
-            'description': ['description', 'memo', 'details']
-        }
+        for name, value in transaction.items():
+            for standard_field, priority in _NAME_TO_FIELDS.get(name, ()):
+                if standard_field in found and found[standard_field][0] < priority:
+                    continue
+                
+                # Clean up the value
+                if standard_field == 'amount':
+                    # Convert to float
+                    if isinstance(value, str):
+                        value = value.translate(_AMOUNT_TRANS)
+                    try:
+                        found[standard_field] = (priority, float(value))
+                    except (ValueError, TypeError):
+                        continue
+                else:
+                    found[standard_field] = (priority, str(value).strip())
         
-        for standard_field, possible_names in field_mappings.items():
-            for name in possible_names:
-                if name in transaction:
-                    value = transaction[name]
-                    
-                    # Clean up the value
-                    if standard_field == 'amount':
-                        # Convert to float
-                        if isinstance(value, str):
-                            value = value.replace('$', '').replace(',', '').replace('(', '-').replace(')', '')
-                        try:
-                            standardized[standard_field] = float(value)
-                        except (ValueError, TypeError):
-                            continue
-                    else:
-                        standardized[standard_field] = str(value).strip()
-                    break
+        standardized = {field: found[field][1] for field in FIELD_MAPPINGS if field in found}
         
         # Only return if we have essential fields
         if 'amount' in standardized and ('merchant' in standardized or 'description' in standardized):
@@ -255,47 +345,32 @@ class StatementParser:
         Returns:
             Dictionary of category totals
         """
-        categories = {}
-        
-        # Category keywords
-        category_keywords = {
-            'Dining & Restaurants': ['restaurant', 'dining', 'food', 'cafe', 'pizza', 'burger', 'starbucks'],
-            'Gas & Auto': ['gas', 'shell', 'chevron', 'exxon', 'bp', 'auto', 'car'],
-            'Groceries': ['grocery', 'supermarket', 'whole foods', 'safeway', 'kroger', 'walmart'],
-            'Shopping & Retail': ['amazon', 'target', 'walmart', 'mall', 'store', 'retail', 'shopping'],
-            'Travel': ['airline', 'hotel', 'travel', 'uber', 'lyft', 'rental', 'airport'],
-            'Utilities': ['electric', 'gas company', 'water', 'internet', 'phone', 'cable'],
-            'Entertainment': ['movie', 'theater', 'netflix', 'spotify', 'game', 'entertainment'],
-            'Healthcare': ['medical', 'doctor', 'pharmacy', 'hospital', 'health'],
-            'Other': []
-        }
+        categories = defaultdict(float)
+        categorize = self._categorize_transaction
         
         for transaction in transactions:
             amount = abs(transaction.get('amount', 0))  # Use absolute value
-            merchant = transaction.get('merchant', '').lower()
-            description = transaction.get('description', '').lower()
-            existing_category = transaction.get('category', '').lower()
-            
-            # Check if category is already provided
-            if existing_category:
-                category = existing_category.title()
-            else:
-                # Categorize based on merchant/description
-                category = 'Other'
-                text_to_check = f"{merchant} {description}"
-                
-                for cat_name, keywords in category_keywords.items():
-                    if any(keyword in text_to_check for keyword in keywords):
-                        category = cat_name
-                        break
             
             # Add to category total
-            if category in categories:
-                categories[category] += amount
-            else:
-                categories[category] = amount
+            categories[categorize(transaction)] += amount
+        
+        return dict(categories)
+    
+    def _categorize_transaction(self, transaction: Dict[str, Any]) -> str:
+        """Return the provided category, or infer one from merchant/description keywords"""
+        # Check if category is already provided
+        existing_category = transaction.get('category', '')
+        if existing_category:
+            return existing_category.lower().title()
         
-        return categories
+        # Categorize based on merchant/description
+        text_to_check = f"{transaction.get('merchant', '')} {transaction.get('description', '')}".lower()
+        best = len(_CATEGORY_NAMES)
+        for match in _CATEGORY_RE.finditer(text_to_check):
+            best = min(best, match.lastindex - 1)
+            if best == 0:
+                break
+        return _CATEGORY_NAMES[best] if best < len(_CATEGORY_NAMES) else 'Other'
 
 # Helper functions for easy statement parsing
 def parse_statement_from_text(statement_text: str) -> Dict[str, Any]:
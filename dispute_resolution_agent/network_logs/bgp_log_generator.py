@@ -6,14 +6,55 @@ Used for testing service-related dispute scenarios involving network issues
 import datetime
 import random
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+EVENT_TYPES = [
+    "PEER_UP", "PEER_DOWN", "ROUTE_UPDATE", "ROUTE_WITHDRAW",
+    "KEEPALIVE", "NOTIFICATION", "OPEN_SENT"
+]
+
+SEVERITY_BY_EVENT = {
+    "PEER_DOWN": "ERROR",
+    "NOTIFICATION": "WARNING", 
+    "PEER_UP": "INFO",
+    "ROUTE_UPDATE": "DEBUG",
+    "ROUTE_WITHDRAW": "INFO",
+    "KEEPALIVE": "DEBUG",
+    "OPEN_SENT": "DEBUG"
+}
+
+PEER_DOWN_REASONS = [
+    "TCP connection lost", "Hold timer expired", 
+    "BGP Notification received", "Administrative shutdown"
+]
+
+ROUTE_EVENTS = ("ROUTE_UPDATE", "ROUTE_WITHDRAW")
+
+ROUTE_ORIGINS = ["IGP", "EGP", "INCOMPLETE"]
+
+NOTIFICATION_ERRORS = [
+    "Message Header Error", "OPEN Message Error",
+    "UPDATE Message Error", "Hold Timer Expired",
+    "Finite State Machine Error", "Cease"
+]
+
+# Private ASNs, as strings, used for the extra hops of generated AS paths
+PRIVATE_ASNS = [str(asn) for asn in range(64512, 65536)]
+
+# Per-event fields kept when logs are stored column-wise
+LOG_COLUMNS = ("timestamp", "event_type", "peer_ip", "severity", "reason")
 
 class BGPLogGenerator:
     """Generate realistic BGP logs for network device simulation"""
     
-    def __init__(self, device_id: str = "RTR-01", asn: int = 65001):
+    def __init__(self, device_id: str = "RTR-01", asn: int = 65001, seed: Optional[int] = None):
         self.device_id = device_id
         self.asn = asn
+        # Batches draw each field as one array from NumPy; single events use
+        # the stdlib generator, which is cheaper per scalar draw
+        self.rng = np.random.default_rng(seed)
+        self.random = random.Random(seed)
         self.peers = [
             {"ip": "192.168.1.1", "asn": 65002, "state": "Established"},
             {"ip": "192.168.1.2", "asn": 65003, "state": "Established"},
@@ -28,16 +69,74 @@ class BGPLogGenerator:
     def generate_bgp_event(self, event_type: str = None) -> Dict[str, Any]:
         """Generate a single BGP log event"""
         if not event_type:
-            event_type = random.choice([
-                "PEER_UP", "PEER_DOWN", "ROUTE_UPDATE", "ROUTE_WITHDRAW",
-                "KEEPALIVE", "NOTIFICATION", "OPEN_SENT"
-            ])
+            event_type = self.random.choice(EVENT_TYPES)
         
-        timestamp = datetime.datetime.now()
-        peer = random.choice(self.peers)
+        peer = self.random.choice(self.peers)
+        return self._build_event(event_type, peer, datetime.datetime.now().isoformat(),
+                                 self._draw_detail(event_type))
+    
+    def _draw_detail(self, event_type: str) -> Any:
+        """Draw the type-specific fields of one event (see _build_event)"""
+        if event_type == "PEER_DOWN":
+            return self.random.choice(PEER_DOWN_REASONS)
+        if event_type in ROUTE_EVENTS:
+            extra_hops = self.random.choices(PRIVATE_ASNS, k=self.random.randrange(4))
+            return self.random.choice(self.route_prefixes), extra_hops, self.random.choice(ROUTE_ORIGINS)
+        if event_type == "NOTIFICATION":
+            return self.random.randint(1, 6), self.random.randint(1, 10), self.random.choice(NOTIFICATION_ERRORS)
+        return None
+    
+    def _draw_details(self, event_types: List[str]) -> List[Any]:
+        """
+        Draw the type-specific fields of a batch of events, one array per
+        field for each event type that needs them
+        """
+        details = [None] * len(event_types)
+        down, route, notification = [], [], []
+        for i, event_type in enumerate(event_types):
+            if event_type == "PEER_DOWN":
+                down.append(i)
+            elif event_type in ROUTE_EVENTS:
+                route.append(i)
+            elif event_type == "NOTIFICATION":
+                notification.append(i)
+        
+        if down:
+            reasons = self.rng.integers(0, len(PEER_DOWN_REASONS), len(down)).tolist()
+            for i, reason in zip(down, reasons):
+                details[i] = PEER_DOWN_REASONS[reason]
         
+        if route:
+            count = len(route)
+            prefixes = self.rng.integers(0, len(self.route_prefixes), count).tolist()
+            origins = self.rng.integers(0, len(ROUTE_ORIGINS), count).tolist()
+            # AS paths are 1-4 hops long: the peer plus up to three private ASNs
+            hop_counts = self.rng.integers(0, 4, count).tolist()
+            hops = self.rng.integers(0, len(PRIVATE_ASNS), (count, 3)).tolist()
+            for i, prefix, origin, hop_count, extra_hops in zip(route, prefixes, origins, hop_counts, hops):
+                details[i] = (self.route_prefixes[prefix], [PRIVATE_ASNS[hop] for hop in extra_hops[:hop_count]],
+                              ROUTE_ORIGINS[origin])
+        
+        if notification:
+            count = len(notification)
+            codes = self.rng.integers(1, 7, count).tolist()
+            subcodes = self.rng.integers(1, 11, count).tolist()
+            descriptions = self.rng.integers(0, len(NOTIFICATION_ERRORS), count).tolist()
+            for i, code, subcode, description in zip(notification, codes, subcodes, descriptions):
+                details[i] = (code, subcode, NOTIFICATION_ERRORS[description])
+        
+        return details
+    
+    def _build_event(self, event_type: str, peer: Dict[str, Any], timestamp: str, detail: Any = None) -> Dict[str, Any]:
+        """
+        Build a BGP log event for a given type, peer and timestamp
+
+        detail holds the already-drawn type-specific fields: the reason for
+        PEER_DOWN, (prefix, extra AS path hops, origin) for route events and
+        (code, subcode, description) for NOTIFICATION
+        """
         base_event = {
-            "timestamp": timestamp.isoformat(),
+            "timestamp": timestamp,
             "device_id": self.device_id,
             "local_asn": self.asn,
             "event_type": event_type,
@@ -49,10 +148,7 @@ class BGPLogGenerator:
         # Add event-specific details
         if event_type == "PEER_DOWN":
             base_event.update({
-                "reason": random.choice([
-                    "TCP connection lost", "Hold timer expired", 
-                    "BGP Notification received", "Administrative shutdown"
-                ]),
+                "reason": detail,
                 "previous_state": "Established",
                 "new_state": "Idle"
             })
@@ -63,88 +159,85 @@ class BGPLogGenerator:
                 "hold_time": 180,
                 "keepalive_time": 60
             })
-        elif event_type in ["ROUTE_UPDATE", "ROUTE_WITHDRAW"]:
+        elif event_type in ROUTE_EVENTS:
+            prefix, extra_hops, origin = detail
             base_event.update({
-                "prefix": random.choice(self.route_prefixes),
+                "prefix": prefix,
                 "next_hop": peer["ip"],
-                "as_path": self._generate_as_path(peer["asn"]),
-                "origin": random.choice(["IGP", "EGP", "INCOMPLETE"])
+                "as_path": " ".join([str(peer["asn"]), *extra_hops]),
+                "origin": origin
             })
         elif event_type == "NOTIFICATION":
+            error_code, error_subcode, error_description = detail
             base_event.update({
-                "error_code": random.choice([1, 2, 3, 4, 5, 6]),
-                "error_subcode": random.randint(1, 10),
-                "error_description": random.choice([
-                    "Message Header Error", "OPEN Message Error",
-                    "UPDATE Message Error", "Hold Timer Expired",
-                    "Finite State Machine Error", "Cease"
-                ])
+                "error_code": error_code,
+                "error_subcode": error_subcode,
+                "error_description": error_description
             })
         
         return base_event
     
+    def _build_events(self, event_types: List[str], peer_indices: List[int], timestamps: List[str]) -> List[Dict[str, Any]]:
+        """Build a list of events from per-event types, peer indices and timestamps"""
+        return [
+            self._build_event(event_type, self.peers[peer_index], timestamp, detail)
+            for event_type, peer_index, timestamp, detail
+            in zip(event_types, peer_indices, timestamps, self._draw_details(event_types))
+        ]
+    
     def _get_severity(self, event_type: str) -> str:
         """Determine log severity based on event type"""
-        severity_map = {
-            "PEER_DOWN": "ERROR",
-            "NOTIFICATION": "WARNING", 
-            "PEER_UP": "INFO",
-            "ROUTE_UPDATE": "DEBUG",
-            "ROUTE_WITHDRAW": "INFO",
-            "KEEPALIVE": "DEBUG",
-            "OPEN_SENT": "DEBUG"
-        }
-        return severity_map.get(event_type, "INFO")
-    
-    def _generate_as_path(self, peer_asn: int) -> str:
-        """Generate a realistic AS path"""
-        path_length = random.randint(1, 4)
-        as_path = [str(peer_asn)]
-        
-        for _ in range(path_length - 1):
-            as_path.append(str(random.randint(64512, 65535)))
-        
-        return " ".join(as_path)
+        return SEVERITY_BY_EVENT.get(event_type, "INFO")
     
     def generate_log_batch(self, count: int = 50) -> List[Dict[str, Any]]:
         """Generate a batch of BGP log events"""
-        events = []
-        for _ in range(count):
-            events.append(self.generate_bgp_event())
-        return events
+        # Draw every event type and peer in one call each
+        event_types = [EVENT_TYPES[i] for i in self.rng.integers(0, len(EVENT_TYPES), count).tolist()]
+        peer_indices = self.rng.integers(0, len(self.peers), count).tolist()
+        # One clock read per batch; events are spaced a microsecond apart and
+        # formatted in a single vectorized conversion
+        base_time = np.datetime64(datetime.datetime.now(), 'us')
+        timestamps = (base_time + np.arange(count)).astype(str).tolist()
+        return self._build_events(event_types, peer_indices, timestamps)
+    
+    @staticmethod
+    def to_columns(events: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Convert a list of events to one array per field in LOG_COLUMNS"""
+        return {
+            column: np.array([event.get(column, "") for event in events], dtype=str)
+            for column in LOG_COLUMNS
+        }
     
-    def simulate_network_outage(self, duration_minutes: int = 30) -> List[Dict[str, Any]]:
-        """Simulate a network outage scenario"""
+    def simulate_network_outage(self, duration_minutes: int = 30,
+                                start_time: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
+        """Simulate a network outage scenario starting at start_time (default: now)"""
         events = []
-        start_time = datetime.datetime.now()
+        if start_time is None:
+            start_time = datetime.datetime.now()
+        
+        outage_time = start_time.isoformat()
         
         # Outage begins - peers go down
         for peer in self.peers[:2]:  # Simulate 2 peers going down
-            event = self.generate_bgp_event("PEER_DOWN")
-            event["peer_ip"] = peer["ip"]
-            event["peer_asn"] = peer["asn"]
-            event["reason"] = "Network unreachable"
-            events.append(event)
+            events.append(self._build_event("PEER_DOWN", peer, outage_time, "Network unreachable"))
         
-        # Routes withdrawn
-        for _ in range(10):
-            event = self.generate_bgp_event("ROUTE_WITHDRAW")
-            events.append(event)
+        # Routes withdrawn during the outage and re-advertised after it,
+        # drawn together as one batch
+        recovery_time = start_time + datetime.timedelta(minutes=duration_minutes)
+        peer_indices = self.rng.integers(0, len(self.peers), 20).tolist()
+        offsets = self.rng.integers(1, 301, 10).tolist()
+        timestamps = [outage_time] * 10 + [
+            (recovery_time + datetime.timedelta(seconds=seconds)).isoformat() for seconds in offsets
+        ]
+        routes = self._build_events(["ROUTE_WITHDRAW"] * 10 + ["ROUTE_UPDATE"] * 10, peer_indices, timestamps)
+        events.extend(routes[:10])
         
         # Recovery - peers come back up
-        recovery_time = start_time + datetime.timedelta(minutes=duration_minutes)
         for peer in self.peers[:2]:
-            event = self.generate_bgp_event("PEER_UP")
-            event["peer_ip"] = peer["ip"]
-            event["peer_asn"] = peer["asn"]
-            event["timestamp"] = recovery_time.isoformat()
-            events.append(event)
+            events.append(self._build_event("PEER_UP", peer, recovery_time.isoformat()))
         
         # Routes re-advertised
-        for _ in range(10):
-            event = self.generate_bgp_event("ROUTE_UPDATE")
-            event["timestamp"] = (recovery_time + datetime.timedelta(seconds=random.randint(1, 300))).isoformat()
-            events.append(event)
+        events.extend(routes[10:])
         
         return events
 
@@ -7,95 +7,125 @@ import sys
 import os
 import json
 import datetime
-from typing import Dict, List, Any
+import functools
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import orjson  # Optional: faster indented JSON output
+except ImportError:
+    orjson = None
+
+# Only a direct script run needs the parent directory on the path; imported
+# as network_logs.network_dispute_integration (or run with -m) it is there
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from network_logs.bgp_log_generator import BGPLogGenerator
 
+def _parse_naive(timestamp: str) -> datetime.datetime:
+    """Parse an ISO timestamp (with or without timezone) as a naive datetime"""
+    try:
+        parsed = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = datetime.datetime.fromisoformat(timestamp.replace('Z', ''))
+    return parsed.replace(tzinfo=None)
+
+def _dump_json(data: Any, path: str) -> None:
+    """Write data to path as JSON indented by two spaces"""
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode()
+    with open(path, 'wb') as f:
+        f.write(payload)
+
 class NetworkServiceDispute:
     """Integration class for network service disputes"""
     
     def __init__(self):
-        self.bgp_generator = BGPLogGenerator("CORE-RTR-01", 65001)
+        # Outages simulated for an explicit start time are reused per
+        # (duration_minutes, start_time)
+        self._cached_outage = functools.lru_cache(maxsize=32)(self._simulated_outage)
+    
+    @functools.cached_property
+    def bgp_generator(self) -> BGPLogGenerator:
+        """Log generator, built on first use"""
+        return BGPLogGenerator("CORE-RTR-01", 65001)
     
-    def analyze_service_outage(self, start_time: str, end_time: str) -> Dict[str, Any]:
+    def _simulated_outage(self, duration_minutes: int,
+                          start_time: datetime.datetime) -> Tuple[List[Dict[str, Any]], Dict[str, np.ndarray], np.ndarray]:
+        """Simulate an outage and return its events, their columns and their parsed timestamps"""
+        outage_logs = self.bgp_generator.simulate_network_outage(duration_minutes, start_time)
+        columns = BGPLogGenerator.to_columns(outage_logs)
+        log_times = np.array([_parse_naive(ts) for ts in columns['timestamp'].tolist()], dtype='datetime64[us]')
+        return outage_logs, columns, log_times
+    
+    def analyze_service_outage(self, start_time: str, end_time: str,
+                               outage_start: Optional[datetime.datetime] = None) -> Dict[str, Any]:
         """
         Analyze BGP logs for service outage periods
         Used when customers report service disruptions
+
+        The simulated outage starts at outage_start; without one it starts
+        now and is simulated afresh on every call
         """
-        outage_logs = self.bgp_generator.simulate_network_outage(45)
+        # Analyses scan one array per field; dicts are kept only for raw_logs
+        if outage_start is None:
+            outage_logs, columns, log_times = self._simulated_outage(45, datetime.datetime.now())
+        else:
+            outage_logs, columns, log_times = self._cached_outage(45, outage_start)
         
-        # Parse time strings (handle both with and without timezone)
-        try:
-            start_dt = datetime.datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-        except:
-            start_dt = datetime.datetime.fromisoformat(start_time.replace('Z', ''))
-            
-        try:
-            end_dt = datetime.datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-        except:
-            end_dt = datetime.datetime.fromisoformat(end_time.replace('Z', ''))
+        # Parse time strings once; all comparisons are timezone-naive
+        start_ts = np.datetime64(_parse_naive(start_time), 'us')
+        end_ts = np.datetime64(_parse_naive(end_time), 'us')
         
-        relevant_logs = []
-        for log in outage_logs:
-            try:
-                log_time = datetime.datetime.fromisoformat(log['timestamp'].replace('Z', '+00:00'))
-            except:
-                log_time = datetime.datetime.fromisoformat(log['timestamp'].replace('Z', ''))
-                
-            # Make all datetime objects timezone-naive for comparison
-            if start_dt.tzinfo:
-                start_dt = start_dt.replace(tzinfo=None)
-            if end_dt.tzinfo:
-                end_dt = end_dt.replace(tzinfo=None)
-            if log_time.tzinfo:
-                log_time = log_time.replace(tzinfo=None)
-                
-            if start_dt <= log_time <= end_dt:
-                relevant_logs.append(log)
+        # Filter every log timestamp in one vectorized comparison
+        in_window = (log_times >= start_ts) & (log_times <= end_ts)
+        relevant = {field: values[in_window] for field, values in columns.items()}
         
         # Analyze the outage
-        peer_down_events = [log for log in relevant_logs if log['event_type'] == 'PEER_DOWN']
-        route_withdrawals = [log for log in relevant_logs if log['event_type'] == 'ROUTE_WITHDRAW']
+        event_types = relevant['event_type']
+        affected_peers = np.unique(relevant['peer_ip'][event_types == 'PEER_DOWN']).size
         
         analysis = {
-            "outage_detected": len(peer_down_events) > 0,
-            "affected_peers": len(set(log['peer_ip'] for log in peer_down_events)),
-            "routes_lost": len(route_withdrawals),
+            "outage_detected": affected_peers > 0,
+            "affected_peers": affected_peers,
+            "routes_lost": int(np.count_nonzero(event_types == 'ROUTE_WITHDRAW')),
             "outage_start": start_time,
             "outage_end": end_time,
-            "root_cause": self._determine_root_cause(relevant_logs),
-            "customer_impact": self._assess_customer_impact(relevant_logs),
-            "raw_logs": relevant_logs[:10]  # Include first 10 logs for evidence
+            "root_cause": self._determine_root_cause(relevant['reason']),
+            "customer_impact": self._assess_customer_impact(relevant['severity']),
+            # Include first 10 logs for evidence
+            "raw_logs": [dict(outage_logs[i]) for i in np.flatnonzero(in_window)[:10]]
         }
         
         return analysis
     
-    def _determine_root_cause(self, logs: List[Dict[str, Any]]) -> str:
-        """Analyze logs to determine likely root cause"""
-        reasons = [log.get('reason', '') for log in logs if log.get('reason')]
+    def _determine_root_cause(self, reasons: np.ndarray) -> str:
+        """Analyze log reasons to determine likely root cause"""
+        def mentioned(text: str) -> bool:
+            return bool((np.char.find(reasons, text) >= 0).any())
         
-        if any('Network unreachable' in reason for reason in reasons):
+        if mentioned('Network unreachable'):
             return "Upstream provider network failure"
-        elif any('TCP connection lost' in reason for reason in reasons):
+        elif mentioned('TCP connection lost'):
             return "Network connectivity issues"
-        elif any('Hold timer expired' in reason for reason in reasons):
+        elif mentioned('Hold timer expired'):
             return "BGP session timeout - possible high latency"
         else:
             return "Undetermined - requires further investigation"
     
-    def _assess_customer_impact(self, logs: List[Dict[str, Any]]) -> str:
-        """Assess the level of customer impact from the outage"""
-        error_events = [log for log in logs if log['severity'] in ['ERROR', 'CRITICAL']]
-        warning_events = [log for log in logs if log['severity'] == 'WARNING']
+    def _assess_customer_impact(self, severities: np.ndarray) -> str:
+        """Assess the level of customer impact from log severities"""
+        error_events = np.count_nonzero(np.isin(severities, ['ERROR', 'CRITICAL']))
+        warning_events = np.count_nonzero(severities == 'WARNING')
         
-        if len(error_events) > 5:
+        if error_events > 5:
             return "HIGH - Multiple critical failures, likely widespread service disruption"
-        elif len(error_events) > 2:
+        elif error_events > 2:
             return "MEDIUM - Some service degradation, partial connectivity loss"
-        elif len(warning_events) > 3:
+        elif warning_events > 3:
             return "LOW - Minor service issues, most customers unaffected"
         else:
             return "MINIMAL - Brief disruption, service quickly restored"
@@ -170,7 +200,6 @@ if __name__ == "__main__":
         print(f"{i}. {log['timestamp']} - {log['event_type']} - {log.get('reason', 'N/A')}")
     
     # Save the dispute data for use in the main agent
-    with open('network_logs/service_dispute_sample.json', 'w') as f:
-        json.dump(sample_dispute, f, indent=2)
+    _dump_json(sample_dispute, 'network_logs/service_dispute_sample.json')
     
     print(f"\nSample dispute saved to: network_logs/service_dispute_sample.json")
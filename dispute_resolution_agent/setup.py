@@ -3,20 +3,91 @@
 Setup script for the Dispute Resolution Agent
 """
 import subprocess
+import configparser
+import functools
+import threading
+import signal
 import sys
 import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Bedrock model listings are cached here for an hour between setup runs
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "questcode")
+MODEL_CACHE_TTL = 3600
 
 def install_requirements():
     """Install required packages"""
     print("Installing required packages...")
+    args = ["install", "-r", "requirements.txt"]
+    try:
+        # Run pip in this interpreter rather than starting a second one
+        from pip._internal.cli.main import main as pip_main
+    except ImportError:
+        pip_main = None
+    
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        if pip_main is None:
+            subprocess.check_call([sys.executable, "-m", "pip"] + args)
+        else:
+            status = pip_main(args)
+            if status:
+                raise subprocess.CalledProcessError(status, ["pip"] + args)
         print("✓ Requirements installed successfully")
     except subprocess.CalledProcessError as e:
         print(f"✗ Error installing requirements: {e}")
         return False
     return True
 
+def _credentials_in_aws_files():
+    """
+    Look for an access key in the AWS CLI credentials/config files
+
+    Returns True or False, or None when neither file could be read
+    """
+    paths = [
+        os.getenv('AWS_SHARED_CREDENTIALS_FILE', '~/.aws/credentials'),
+        os.getenv('AWS_CONFIG_FILE', '~/.aws/config')
+    ]
+    parser = configparser.ConfigParser()
+    try:
+        if not parser.read([os.path.expanduser(path) for path in paths]):
+            return None
+    except configparser.Error:
+        return None
+    return any(parser.has_option(section, 'aws_access_key_id') for section in parser.sections())
+
+def _aws_cli_reports(marker, timeout=3):
+    """
+    Stream `aws configure list` and stop as soon as a line contains marker
+
+    The CLI is killed once the marker is seen or after timeout seconds
+    """
+    try:
+        # Own process group, so children of the CLI (e.g. the v2 bootloader's) die with it
+        proc = subprocess.Popen(['aws', 'configure', 'list'], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True, start_new_session=True)
+    except FileNotFoundError:
+        return False
+    
+    def stop():
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            proc.kill()
+    
+    # The deadline holds even when the CLI stalls without printing a line
+    deadline = threading.Timer(timeout, stop)
+    deadline.start()
+    try:
+        return any(marker in line for line in proc.stdout)
+    finally:
+        deadline.cancel()
+        stop()
+        proc.wait()
+        proc.stdout.close()
+
 def check_aws_credentials():
     """Check if AWS credentials are configured"""
     print("\nChecking AWS credentials...")
@@ -26,15 +97,16 @@ def check_aws_credentials():
         print("✓ AWS credentials found in environment variables")
         return True
     
-    # Check AWS CLI configuration
-    try:
-        result = subprocess.run(['aws', 'configure', 'list'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0 and 'access_key' in result.stdout:
-            print("✓ AWS credentials found in AWS CLI configuration")
-            return True
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
+    # Check AWS CLI configuration files directly
+    if _credentials_in_aws_files():
+        print("✓ AWS credentials found in AWS CLI configuration")
+        return True
+    
+    # No static keys in the files (or none readable): ask the AWS CLI, which
+    # also resolves SSO, credential_process and assumed-role profiles
+    if _aws_cli_reports('access_key'):
+        print("✓ AWS credentials found in AWS CLI configuration")
+        return True
     
     print("⚠ AWS credentials not found. Please configure using one of these methods:")
     print("  1. Set environment variables: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY")
@@ -42,21 +114,74 @@ def check_aws_credentials():
     print("  3. Use IAM roles (if running on EC2)")
     return False
 
+def _prewarm_botocore():
+    """Import botocore so a later import finds it already loaded"""
+    try:
+        import botocore.session
+    except ImportError:
+        pass
+
+@functools.lru_cache(maxsize=None)
+def _get_client(service, region):
+    """Return a botocore client for a service and region, built once per process"""
+    # Imported here: botocore may only have been installed by install_requirements().
+    # A plain botocore client is enough for one low-level call; boto3 adds nothing
+    import botocore.session
+    from botocore.config import Config
+    # Same settings as the agent's BEDROCK_CLIENT_CONFIG (agent/dispute_agent.py); not
+    # imported from there, as that would pull boto3 and numpy into the setup script
+    config = Config(
+        max_pool_connections=32,
+        retries={'max_attempts': 3, 'mode': 'adaptive'},
+        tcp_keepalive=True
+    )
+    return botocore.session.get_session().create_client(service, region_name=region, config=config)
+
+def _list_bedrock_model_ids(region):
+    """
+    Return (Anthropic model ids, embedding model ids, whether they came from cache)
+
+    Listings are cached on disk per region and AWS profile for MODEL_CACHE_TTL seconds
+    """
+    profile = os.getenv('AWS_PROFILE', 'default')
+    cache_path = os.path.join(CACHE_DIR, f"bedrock_models_{region}_{profile}.json")
+    try:
+        if time.time() - os.path.getmtime(cache_path) < MODEL_CACHE_TTL:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            return cached['claude'], cached['embedding'], True
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    client = _get_client('bedrock', region)
+    
+    # Try to list foundation models (this requires bedrock:ListFoundationModels permission).
+    # Only the two filtered slices we check are fetched, in parallel, not the whole catalog
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        claude_request = pool.submit(client.list_foundation_models, byProvider='Anthropic')
+        embedding_request = pool.submit(client.list_foundation_models, byOutputModality='EMBEDDING')
+        claude_ids = [model['modelId'] for model in claude_request.result().get('modelSummaries', [])]
+        embedding_ids = [model['modelId'] for model in embedding_request.result().get('modelSummaries', [])]
+    
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump({'claude': claude_ids, 'embedding': embedding_ids}, f)
+    except OSError:
+        pass
+    return claude_ids, embedding_ids, False
+
 def check_bedrock_access():
     """Check if Bedrock models are accessible"""
     print("\nChecking AWS Bedrock access...")
     try:
-        import boto3
-        client = boto3.client('bedrock', region_name='us-east-1')
-        
-        # Try to list foundation models (this requires bedrock:ListFoundationModels permission)
-        models = client.list_foundation_models()
-        print(f"✓ Bedrock access confirmed. Found {len(models.get('modelSummaries', []))} models")
+        claude_ids, embedding_ids, cached = _list_bedrock_model_ids('us-east-1')
+        source = "cached model list" if cached else "live model list"
+        print(f"✓ Bedrock access confirmed. Found {len(claude_ids)} Anthropic and {len(embedding_ids)} embedding models ({source})")
         
         # Check if our specific models are available
-        model_ids = [model['modelId'] for model in models.get('modelSummaries', [])]
-        claude_available = any('claude-3' in model_id for model_id in model_ids)
-        titan_available = any('titan-embed' in model_id for model_id in model_ids)
+        claude_available = any('claude-3' in model_id for model_id in claude_ids)
+        titan_available = any('titan-embed' in model_id for model_id in embedding_ids)
         
         if claude_available:
             print("✓ Claude models available")
@@ -87,6 +212,9 @@ def main():
         print("Setup failed at requirements installation")
         return False
     
+    # Load botocore in the background while credentials are checked
+    threading.Thread(target=_prewarm_botocore, daemon=True).start()
+    
     # Check AWS credentials
     aws_creds_ok = check_aws_credentials()
     